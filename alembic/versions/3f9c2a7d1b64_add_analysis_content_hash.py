@@ -0,0 +1,32 @@
+"""add analysis content hash
+
+Revision ID: 3f9c2a7d1b64
+Revises:
+Create Date: 2026-10-17 09:12:40.118342
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c2a7d1b64"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("analysis", sa.Column("content_hash", sa.String(64), nullable=True))
+    op.add_column("analysis", sa.Column("analyzer_version", sa.String(), nullable=True))
+    op.create_index(
+        op.f("ix_analysis_content_hash"), "analysis", ["content_hash"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_analysis_content_hash"), table_name="analysis")
+    op.drop_column("analysis", "analyzer_version")
+    op.drop_column("analysis", "content_hash")
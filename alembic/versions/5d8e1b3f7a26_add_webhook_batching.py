@@ -0,0 +1,32 @@
+"""add webhook batching
+
+Revision ID: 5d8e1b3f7a26
+Revises: e2a6f0b8d417
+Create Date: 2026-10-17 18:04:11.326590
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5d8e1b3f7a26"
+down_revision: Union[str, None] = "e2a6f0b8d417"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "webhook_configs", sa.Column("batch_window", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "webhook_configs", sa.Column("batch_max_size", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("webhook_configs", "batch_max_size")
+    op.drop_column("webhook_configs", "batch_window")
@@ -0,0 +1,88 @@
+"""move html content to blob store
+
+Revision ID: 8b1e4d2c6a90
+Revises: 3f9c2a7d1b64
+Create Date: 2026-10-17 11:40:03.552907
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.blob_store import create_blob_store
+
+# revision identifiers, used by Alembic.
+revision: str = "8b1e4d2c6a90"
+down_revision: Union[str, None] = "3f9c2a7d1b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+
+def upgrade() -> None:
+    op.create_table(
+        "page_blobs",
+        sa.Column("key", sa.String(64), nullable=False),
+        sa.Column("oid", sa.BigInteger(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("key"),
+    )
+    op.add_column("analysis", sa.Column("html_blob_key", sa.String(64), nullable=True))
+    op.add_column("analysis", sa.Column("html_size", sa.Integer(), nullable=True))
+
+    # Move existing bodies into the blob store before dropping the column
+    bind = op.get_bind()
+    store = create_blob_store(bind)
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, html_content FROM analysis "
+                "WHERE html_content IS NOT NULL AND html_blob_key IS NULL "
+                "LIMIT :limit"
+            ),
+            {"limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        for analysis_id, html_content in rows:
+            bind.execute(
+                sa.text(
+                    "UPDATE analysis SET html_blob_key = :key, html_size = :size "
+                    "WHERE id = :id"
+                ),
+                {
+                    "key": store.put_text(html_content),
+                    "size": len(html_content),
+                    "id": analysis_id,
+                },
+            )
+
+    op.drop_column("analysis", "html_content")
+
+
+def downgrade() -> None:
+    op.add_column("analysis", sa.Column("html_content", sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    store = create_blob_store(bind)
+    rows = bind.execute(
+        sa.text(
+            "SELECT id, html_blob_key FROM analysis WHERE html_blob_key IS NOT NULL"
+        )
+    ).all()
+    for analysis_id, key in rows:
+        bind.execute(
+            sa.text("UPDATE analysis SET html_content = :html WHERE id = :id"),
+            {"html": store.get_text(key), "id": analysis_id},
+        )
+
+    op.drop_column("analysis", "html_size")
+    op.drop_column("analysis", "html_blob_key")
+    op.drop_table("page_blobs")
@@ -0,0 +1,150 @@
+"""partition event tables by month
+
+Revision ID: 9a4c6e2d8b13
+Revises: 5d8e1b3f7a26
+Create Date: 2026-10-17 19:26:48.904215
+
+"""
+
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.db.partitions import (
+    PARTITIONED_TABLES,
+    add_months,
+    create_default_partition,
+    create_partitions,
+    month_start,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4c6e2d8b13"
+down_revision: Union[str, None] = "5d8e1b3f7a26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _event_columns() -> list:
+    return [
+        sa.Column("analysis_id", sa.UUID(), nullable=False),
+        sa.Column("event_type", sa.String(), nullable=False),
+        sa.Column("event_data", sa.JSON(), nullable=False),
+        sa.Column("triggered_by", sa.String(), nullable=True),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    ]
+
+
+def _delivery_columns() -> list:
+    return [
+        sa.Column("webhook_config_id", sa.UUID(), nullable=False),
+        sa.Column("analysis_event_id", sa.UUID(), nullable=False),
+        sa.Column("attempt_count", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("request_details", sa.JSON(), nullable=True),
+        sa.Column("response_details", sa.JSON(), nullable=True),
+        sa.Column("next_retry_at", sa.DateTime(), nullable=True),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    ]
+
+
+def _rebuild(partitioned: bool) -> None:
+    """
+    Recreate both tables and copy the rows over. Existing constraint and
+    index names are freed by dropping the old tables before they are
+    recreated.
+    """
+    bind = op.get_bind()
+    for table in PARTITIONED_TABLES:
+        op.rename_table(table, f"{table}_old")
+
+    table_kwargs = (
+        {"postgresql_partition_by": "RANGE (created_at)"} if partitioned else {}
+    )
+    columns = {
+        "analysis_events": _event_columns(),
+        "webhook_deliveries": _delivery_columns(),
+    }
+    for table in PARTITIONED_TABLES:
+        op.create_table(table, *columns[table], **table_kwargs)
+
+    if partitioned:
+        now = datetime.utcnow()
+        oldest = bind.execute(
+            sa.text(
+                "SELECT LEAST("
+                "(SELECT min(created_at) FROM analysis_events_old), "
+                "(SELECT min(created_at) FROM webhook_deliveries_old))"
+            )
+        ).scalar()
+        end = add_months(month_start(now), settings.EVENT_PARTITION_PREMAKE_MONTHS + 1)
+        for table in PARTITIONED_TABLES:
+            create_partitions(bind, table, oldest or now, end)
+            create_default_partition(bind, table)
+
+    for table in PARTITIONED_TABLES:
+        names = ", ".join(column.name for column in columns[table])
+        op.execute(f"INSERT INTO {table} ({names}) SELECT {names} FROM {table}_old")
+    op.drop_table("webhook_deliveries_old")
+    op.drop_table("analysis_events_old")
+
+    primary_key = ["id", "created_at"] if partitioned else ["id"]
+    op.create_primary_key("analysis_events_pkey", "analysis_events", primary_key)
+    op.create_foreign_key(
+        "analysis_events_analysis_id_fkey",
+        "analysis_events",
+        "analysis",
+        ["analysis_id"],
+        ["id"],
+    )
+    op.create_index(
+        op.f("ix_analysis_events_analysis_id"), "analysis_events", ["analysis_id"]
+    )
+
+    op.create_primary_key("webhook_deliveries_pkey", "webhook_deliveries", primary_key)
+    op.create_foreign_key(
+        "webhook_deliveries_webhook_config_id_fkey",
+        "webhook_deliveries",
+        "webhook_configs",
+        ["webhook_config_id"],
+        ["id"],
+    )
+    if not partitioned:
+        op.create_foreign_key(
+            "webhook_deliveries_analysis_event_id_fkey",
+            "webhook_deliveries",
+            "analysis_events",
+            ["analysis_event_id"],
+            ["id"],
+        )
+    op.create_index(
+        op.f("ix_webhook_deliveries_webhook_config_id"),
+        "webhook_deliveries",
+        ["webhook_config_id"],
+    )
+    op.create_index(
+        op.f("ix_webhook_deliveries_analysis_event_id"),
+        "webhook_deliveries",
+        ["analysis_event_id"],
+    )
+    op.create_index(
+        "ix_webhook_deliveries_pending_next_retry_at",
+        "webhook_deliveries",
+        ["next_retry_at"],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def upgrade() -> None:
+    _rebuild(partitioned=True)
+
+
+def downgrade() -> None:
+    _rebuild(partitioned=False)
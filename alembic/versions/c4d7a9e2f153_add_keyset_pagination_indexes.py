@@ -0,0 +1,57 @@
+"""add keyset pagination indexes
+
+Revision ID: c4d7a9e2f153
+Revises: 8b1e4d2c6a90
+Create Date: 2026-10-17 14:05:27.904116
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d7a9e2f153"
+down_revision: Union[str, None] = "8b1e4d2c6a90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Build without locking writes; CONCURRENTLY cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_analysis_website_id_created_at_id",
+            "analysis",
+            ["website_id", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_analysis_created_by_created_at_id",
+            "analysis",
+            ["created_by", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_website_user_id_created_at_id",
+            "website",
+            ["user_id", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_user_subscription_tier_created_at_id",
+            "user",
+            ["subscription_tier", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in (
+            ("ix_user_subscription_tier_created_at_id", "user"),
+            ("ix_website_user_id_created_at_id", "website"),
+            ("ix_analysis_created_by_created_at_id", "analysis"),
+            ("ix_analysis_website_id_created_at_id", "analysis"),
+        ):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
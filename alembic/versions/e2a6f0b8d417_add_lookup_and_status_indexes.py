@@ -0,0 +1,94 @@
+"""add lookup and status indexes
+
+Revision ID: e2a6f0b8d417
+Revises: c4d7a9e2f153
+Create Date: 2026-10-17 15:31:52.470683
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a6f0b8d417"
+down_revision: Union[str, None] = "c4d7a9e2f153"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ANALYSIS_DATA_TABLES = (
+    "seo_data",
+    "performance_data",
+    "security_data",
+    "accessibility_data",
+)
+
+
+def upgrade() -> None:
+    # Build without locking writes; CONCURRENTLY cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_analysis_status"),
+            "analysis",
+            ["status"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f("ix_analysis_events_analysis_id"),
+            "analysis_events",
+            ["analysis_id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f("ix_webhook_deliveries_webhook_config_id"),
+            "webhook_deliveries",
+            ["webhook_config_id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f("ix_webhook_deliveries_analysis_event_id"),
+            "webhook_deliveries",
+            ["analysis_event_id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_webhook_deliveries_pending_next_retry_at",
+            "webhook_deliveries",
+            ["next_retry_at"],
+            postgresql_where=sa.text("status = 'pending'"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_webhook_configs_active_website_id",
+            "webhook_configs",
+            ["website_id"],
+            postgresql_where=sa.text("is_active"),
+            postgresql_concurrently=True,
+        )
+        for table in ANALYSIS_DATA_TABLES:
+            op.create_index(
+                op.f(f"ix_{table}_analysis_id"),
+                table,
+                ["analysis_id"],
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in ANALYSIS_DATA_TABLES:
+            op.drop_index(
+                op.f(f"ix_{table}_analysis_id"),
+                table_name=table,
+                postgresql_concurrently=True,
+            )
+        for name, table in (
+            ("ix_webhook_configs_active_website_id", "webhook_configs"),
+            ("ix_webhook_deliveries_pending_next_retry_at", "webhook_deliveries"),
+            (op.f("ix_webhook_deliveries_analysis_event_id"), "webhook_deliveries"),
+            (op.f("ix_webhook_deliveries_webhook_config_id"), "webhook_deliveries"),
+            (op.f("ix_analysis_events_analysis_id"), "analysis_events"),
+            (op.f("ix_analysis_status"), "analysis"),
+        ):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -53,18 +53,20 @@
 #         )
 #     return current_user
 
-from typing import Generator
+from typing import AsyncGenerator, Generator
+from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
-from app.db.session import SessionLocal
-from app.models.user import User
+from app.db.session import AsyncSessionLocal, SessionLocal
 from app.crud.crud_user import user as user_crud
+from app.core.principal_cache import principal_cache
 from app.core.security import decode_token
-from app.core.redis import redis_client
+from app.core.redis import RedisClient, redis_client
+from app.schemas.token import TokenPayload
+from app.schemas.user import UserPrincipal
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
@@ -79,28 +81,40 @@ def get_db() -> Generator:
         db.close()
 
 
-async def get_redis():
-    return await redis_client.get_connection()
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_redis() -> RedisClient:
+    return redis_client
 
 
 async def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> User:
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(reusable_oauth2)
+) -> UserPrincipal:
+    """
+    Resolve the bearer token to a user principal. Principals are served from
+    the user cache, so the database is only hit on a cache miss.
+    """
     try:
-        payload = decode_token(token)
-        if payload is None:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Could not validate credentials",
-            )
-        user = user_crud.get(db, id=payload.sub)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        if not user.is_active:
-            raise HTTPException(status_code=400, detail="Inactive user")
-        return user
-    except (jwt.JWTError, ValidationError):
+        token_data = TokenPayload(**decode_token(token))
+        user_id = UUID(token_data.sub)
+    except (ValueError, TypeError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+
+    principal = await principal_cache.get(user_id)
+    if principal is None:
+        generation = await principal_cache.generation(user_id)
+        user = await user_crud.get_async(db, id=user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal = UserPrincipal.model_validate(user)
+        await principal_cache.set(principal, generation)
+
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
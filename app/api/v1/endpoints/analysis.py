@@ -1,13 +1,23 @@
-from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+import math
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Header, Query
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
+from app.core.config import settings
 from app.core.rate_limit import check_rate_limit
-from app.core.redis import RedisClient
-from app.models.user import User
-from app.schemas.analysis import AnalysisCreate, AnalysisResponse, AnalysisDetail
-from app.services import parser_service, analyzer_service
+from app.schemas.user import UserPrincipal
+from app.crud.base import InvalidCursor
+from app.crud.crud_analysis import analysis as analysis_crud
+from app.schemas.analysis import (
+    AnalysisCreate,
+    AnalysisResponse,
+    AnalysisDetail,
+    AnalysisSummary,
+)
+from app.schemas.base import Page
+from app.services.parser_service import parser_service
+from app.services.analyzer_service import analyzer_service
 from app.core.celery_app import celery_app
 
 router = APIRouter()
@@ -16,10 +26,9 @@ router = APIRouter()
 @router.post("/", response_model=AnalysisResponse)
 async def create_analysis(
     *,
-    db: Session = Depends(deps.get_db),
-    redis: RedisClient = Depends(deps.get_redis),
+    db: AsyncSession = Depends(deps.get_async_db),
     analysis_in: AnalysisCreate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """
     Create new analysis following the sequence:
@@ -28,9 +37,14 @@ async def create_analysis(
     3. Schedule analysis task
     """
     # Check rate limit
-    if not await check_rate_limit(redis, current_user.id):
+    rate_limit = await check_rate_limit(
+        current_user.id, tier=current_user.subscription_tier
+    )
+    if not rate_limit.allowed:
         raise HTTPException(
-            status_code=429, detail="Rate limit exceeded. Please try again later."
+            status_code=429,
+            detail="Rate limit exceeded. Please try again later.",
+            headers={"Retry-After": str(math.ceil(rate_limit.retry_after))},
         )
 
     # Create analysis record
@@ -57,34 +71,69 @@ async def create_analysis(
     )
 
 
+@router.get("/", response_model=Page[AnalysisSummary])
+async def list_analyses(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
+) -> Any:
+    """
+    List the current user's analyses, newest first.
+    Pass the returned next_cursor to fetch the following page.
+    """
+    try:
+        items, next_cursor = await analysis_crud.get_page_by_user_async(
+            db, user_id=current_user.id, cursor=cursor, limit=limit
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return Page[AnalysisSummary](
+        items=[AnalysisSummary.model_validate(item) for item in items],
+        next_cursor=next_cursor,
+    )
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses the weak comparison (RFC 9110, section 13.1.2)"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
 @router.get("/{analysis_id}", response_model=AnalysisDetail)
 async def get_analysis(
     *,
-    db: Session = Depends(deps.get_db),
-    redis: RedisClient = Depends(deps.get_redis),
     analysis_id: str,
-    current_user: User = Depends(deps.get_current_user),
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserPrincipal = Depends(deps.get_current_user),
 ) -> Any:
     """
-    Get analysis results with caching:
-    1. Check cache
-    2. Verify access
-    3. Load from database if not in cache
+    Get analysis results through the read-through cache. Concurrent misses
+    are coalesced, so only one request rebuilds an expired entry. Clients
+    revalidating with the ETag get a 304 without the body.
     """
-    # Try to get from cache
-    cached_result = await redis.get(f"analysis:{analysis_id}")
-    if cached_result:
-        return cached_result
-
-    # Get from database
-    analysis = await analyzer_service.get_complete_analysis(
-        db=db, analysis_id=analysis_id, user_id=current_user.id
+    payload = await analyzer_service.get_complete_analysis_payload(
+        analysis_id=analysis_id, user_id=current_user.id
     )
-
-    if not analysis:
+    if payload is None:
         raise HTTPException(status_code=404, detail="Analysis not found")
 
-    # Cache the result
-    await redis.set(f"analysis:{analysis_id}", analysis.dict(), expire=3600)  # 1 hour
+    headers = {
+        "ETag": payload.etag,
+        "Cache-Control": (
+            settings.ANALYSIS_CACHE_CONTROL_FINISHED
+            if payload.finished
+            else settings.ANALYSIS_CACHE_CONTROL_IN_PROGRESS
+        ),
+        "Vary": "Authorization",
+    }
+    if if_none_match and etag_matches(if_none_match, payload.etag):
+        return Response(status_code=304, headers=headers)
 
-    return analysis
+    return Response(
+        content=payload.content, media_type="application/json", headers=headers
+    )
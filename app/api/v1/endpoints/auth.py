@@ -2,11 +2,12 @@ from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Body, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
 from app.core import security
 from app.core.config import settings
 from app.crud import crud_user
+from app.schemas import user as user_schemas
 from app.schemas.auth import Token, UserCreate, User
 from app.models.user import User as UserModel
 
@@ -15,12 +16,20 @@ router = APIRouter()
 
 @router.post("/login/access-token", response_model=Token)
 async def login_access_token(
-    db: Session = Depends(deps.get_db), form_data: OAuth2PasswordRequestForm = Depends()
+    db: AsyncSession = Depends(deps.get_async_db),
+    form_data: OAuth2PasswordRequestForm = Depends(),
 ) -> Any:
     """OAuth2 compatible token login, get an access token for future requests."""
-    user = crud_user.user.authenticate(
-        db, email=form_data.username, password=form_data.password
-    )
+    try:
+        user = await crud_user.user.authenticate_async(
+            db, email=form_data.username, password=form_data.password
+        )
+    except security.PasswordHasherBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many login attempts in progress. Please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     elif not user.is_active:
@@ -36,17 +45,30 @@ async def login_access_token(
 
 
 @router.post("/signup", response_model=User)
-def create_user(
+async def create_user(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     user_in: UserCreate,
 ) -> Any:
     """Create new user."""
-    user = crud_user.user.get_by_email(db, email=user_in.email)
+    user = await crud_user.user.get_by_email_async(db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=400,
             detail="A user with this email already exists.",
         )
-    user = crud_user.user.create(db, obj_in=user_in)
+    try:
+        # Signups get the defaults; clients cannot choose flags or a tier
+        user = await crud_user.user.create_async(
+            db,
+            obj_in=user_schemas.UserCreate(
+                email=user_in.email, password=user_in.password
+            ),
+        )
+    except security.PasswordHasherBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many signups in progress. Please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
     return user
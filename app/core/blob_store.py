@@ -0,0 +1,193 @@
+import gzip
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator, Optional, Union
+from sqlalchemy import Connection, Engine, delete, select
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import settings
+from app.models.blob import PageBlob
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - falls back to gzip
+    zstandard = None
+
+# One-byte codec marker prepended to every stored blob, so blobs written
+# with a different BLOB_STORE_COMPRESSION setting stay readable
+ZSTD_MARKER = b"Z"
+GZIP_MARKER = b"G"
+
+
+class BlobStore(ABC):
+    """
+    Content-addressed, compressed storage for page bodies.
+    Blobs are keyed by the SHA-256 of their uncompressed bytes, so storing
+    the same page twice is free.
+    """
+
+    def __init__(self, compression: str = "zstd"):
+        self.use_zstd = compression == "zstd" and zstandard is not None
+
+    def put(self, data: bytes) -> str:
+        key = hashlib.sha256(data).hexdigest()
+        if not self._exists(key):
+            self._write(key, self._compress(data))
+        return key
+
+    def get(self, key: str) -> Optional[bytes]:
+        payload = self._read(key)
+        return self._decompress(payload) if payload is not None else None
+
+    def put_text(self, text: str) -> str:
+        return self.put(text.encode("utf-8"))
+
+    def get_text(self, key: str) -> Optional[str]:
+        data = self.get(key)
+        return data.decode("utf-8") if data is not None else None
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.use_zstd:
+            return ZSTD_MARKER + zstandard.ZstdCompressor(level=3).compress(data)
+        return GZIP_MARKER + gzip.compress(data, compresslevel=6)
+
+    def _decompress(self, payload: bytes) -> bytes:
+        marker, body = payload[:1], payload[1:]
+        if marker == ZSTD_MARKER:
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read this blob")
+            return zstandard.ZstdDecompressor().decompress(body)
+        return gzip.decompress(body)
+
+    @abstractmethod
+    def _exists(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def _read(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    def _write(self, key: str, payload: bytes) -> None: ...
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under a root directory, fanned out by key prefix"""
+
+    def __init__(self, root: str, compression: str = "zstd"):
+        super().__init__(compression)
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def _exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, payload: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class PostgresLargeObjectBlobStore(BlobStore):
+    """
+    Blobs as Postgres large objects, indexed by the page_blobs table.
+    ``bind`` is an Engine, or a Connection whose transaction the store joins.
+    """
+
+    def __init__(self, bind: Union[Engine, Connection], compression: str = "zstd"):
+        super().__init__(compression)
+        self.bind = bind
+
+    @contextmanager
+    def _begin(self) -> Iterator[Connection]:
+        if isinstance(self.bind, Connection):
+            yield self.bind
+        else:
+            with self.bind.begin() as conn:
+                yield conn
+
+    def _exists(self, key: str) -> bool:
+        with self._begin() as conn:
+            row = conn.execute(select(PageBlob.id).where(PageBlob.key == key)).first()
+            return row is not None
+
+    def _read(self, key: str) -> Optional[bytes]:
+        with self._begin() as conn:
+            oid = conn.execute(select(PageBlob.oid).where(PageBlob.key == key)).scalar()
+            if oid is None:
+                return None
+            lobj = conn.connection.dbapi_connection.lobject(oid, "rb")
+            try:
+                return lobj.read()
+            finally:
+                lobj.close()
+
+    def _write(self, key: str, payload: bytes) -> None:
+        with self._begin() as conn:
+            dbapi_connection = conn.connection.dbapi_connection
+            lobj = dbapi_connection.lobject(0, "wb")
+            try:
+                lobj.write(payload)
+                oid = lobj.oid
+            finally:
+                lobj.close()
+
+            result = conn.execute(
+                insert(PageBlob)
+                .values(key=key, oid=oid, size=len(payload))
+                .on_conflict_do_nothing(index_elements=["key"])
+            )
+            if result.rowcount == 0:
+                # Another writer stored the same content first
+                dbapi_connection.lobject(oid).unlink()
+
+    def delete(self, key: str) -> None:
+        with self._begin() as conn:
+            oid = conn.execute(
+                delete(PageBlob).where(PageBlob.key == key).returning(PageBlob.oid)
+            ).scalar()
+            if oid is not None:
+                conn.connection.dbapi_connection.lobject(oid).unlink()
+
+
+def create_blob_store(bind: Union[Engine, Connection, None] = None) -> BlobStore:
+    """Blob store for the configured backend; ``bind`` overrides the engine"""
+    if settings.BLOB_STORE_BACKEND == "postgres":
+        if bind is None:
+            from app.db.session import engine as bind
+
+        return PostgresLargeObjectBlobStore(
+            bind, compression=settings.BLOB_STORE_COMPRESSION
+        )
+    return LocalBlobStore(
+        settings.BLOB_STORE_PATH, compression=settings.BLOB_STORE_COMPRESSION
+    )
+
+
+blob_store = create_blob_store()
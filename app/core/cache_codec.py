@@ -0,0 +1,107 @@
+import struct
+from typing import Any, Generic, Optional, Type, TypeVar
+import orjson
+from pydantic import BaseModel
+from app.core.config import settings
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is optional
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - compression is optional
+    zstandard = None
+
+ModelType = TypeVar("ModelType", bound=BaseModel)
+
+# magic, header format, flags, schema version
+HEADER = struct.Struct(">2sBBH")
+MAGIC = b"SB"
+HEADER_FORMAT = 1
+FLAG_MSGPACK = 0x01
+FLAG_ZSTD = 0x02
+
+
+class CacheCodec(Generic[ModelType]):
+    """
+    Compact, versioned encoding of a Pydantic model for the Redis cache.
+    Payloads carry a header with the model's schema version; payloads written
+    for another version (or garbage) decode to None and count as a miss.
+    """
+
+    def __init__(
+        self,
+        model: Type[ModelType],
+        schema_version: int,
+        serializer: Optional[str] = None,
+        compress_min_bytes: Optional[int] = None,
+    ):
+        self.model = model
+        self.schema_version = schema_version
+        serializer = serializer or settings.CACHE_SERIALIZER
+        self.use_msgpack = serializer == "msgpack" and msgpack is not None
+        self.compress_min_bytes = (
+            compress_min_bytes
+            if compress_min_bytes is not None
+            else settings.CACHE_COMPRESS_MIN_BYTES
+        )
+        self.use_zstd = settings.CACHE_COMPRESSION == "zstd" and zstandard is not None
+
+    def encode(self, obj: ModelType) -> bytes:
+        data = obj.model_dump(mode="json")
+        flags = 0
+        if self.use_msgpack:
+            body = msgpack.packb(data)
+            flags |= FLAG_MSGPACK
+        else:
+            body = orjson.dumps(data)
+        if self.use_zstd and len(body) >= self.compress_min_bytes:
+            body = zstandard.ZstdCompressor(level=3).compress(body)
+            flags |= FLAG_ZSTD
+        return HEADER.pack(MAGIC, HEADER_FORMAT, flags, self.schema_version) + body
+
+    def _body(self, payload: Optional[bytes]) -> Optional[tuple]:
+        if not payload or len(payload) < HEADER.size:
+            return None
+        magic, header_format, flags, schema_version = HEADER.unpack_from(payload)
+        if (
+            magic != MAGIC
+            or header_format != HEADER_FORMAT
+            or schema_version != self.schema_version
+        ):
+            return None
+        body = payload[HEADER.size :]
+        if flags & FLAG_ZSTD:
+            if zstandard is None:
+                return None
+            body = zstandard.ZstdDecompressor().decompress(body)
+        if flags & FLAG_MSGPACK and msgpack is None:
+            return None
+        return flags, body
+
+    def loads(self, payload: Optional[bytes]) -> Optional[Any]:
+        """Plain JSON-compatible data, without model validation"""
+        decoded = self._body(payload)
+        if decoded is None:
+            return None
+        flags, body = decoded
+        return msgpack.unpackb(body) if flags & FLAG_MSGPACK else orjson.loads(body)
+
+    def to_json(self, payload: Optional[bytes]) -> Optional[bytes]:
+        """
+        JSON bytes ready to be sent as a response body. Payloads of the
+        current schema version were produced by ``encode`` from a validated
+        model, so they are passed through without re-validation.
+        """
+        decoded = self._body(payload)
+        if decoded is None:
+            return None
+        flags, body = decoded
+        return orjson.dumps(msgpack.unpackb(body)) if flags & FLAG_MSGPACK else body
+
+    def decode(self, payload: Optional[bytes]) -> Optional[ModelType]:
+        """Validated model instance"""
+        data = self.loads(payload)
+        return self.model.model_validate(data) if data is not None else None
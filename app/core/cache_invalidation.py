@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import uuid
+from typing import Any, Callable, Iterable, List, Optional
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.redis import RedisClient, redis_client
+
+logger = logging.getLogger(__name__)
+
+
+def entity_tag(tablename: str, id: Any) -> str:
+    """Tag under which cache entries derived from a row are indexed"""
+    return f"{tablename}:{id}"
+
+
+def tag_index_key(tag: str) -> str:
+    return f"cache_tag:{tag}"
+
+
+def generation_key(name: str) -> str:
+    """Counter bumped on every write or invalidation of a cache key or tag"""
+    return f"cache_gen:{name}"
+
+
+class InvalidationBus:
+    """
+    Keeps in-process caches coherent across API and worker processes.
+    Invalidating a tag deletes every Redis entry indexed under it and
+    broadcasts the tag over pub/sub; each process then drops its local
+    copies through the registered handlers. Invalidations also bump the
+    tag's generation, so loads that started earlier do not store their
+    results.
+    """
+
+    def __init__(self, redis: RedisClient, channel: str):
+        self.redis = redis
+        self.channel = channel
+        # Prefix of messages from ``publish``, which the publisher has
+        # already applied locally
+        self.origin = uuid.uuid4().hex
+        self._handlers: List[Callable[[Optional[str]], None]] = []
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, handler: Callable[[Optional[str]], None]) -> None:
+        """
+        Register a local handler; it is called with each invalidated tag or
+        key, or with None when messages may have been missed
+        """
+        self._handlers.append(handler)
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        tags = list(tags)
+        try:
+            redis = await self.redis.get_connection()
+            async with redis.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.smembers(tag_index_key(tag))
+                members = await pipe.execute()
+                for tag, keys in zip(tags, members):
+                    pipe.delete(tag_index_key(tag), *keys)
+                    pipe.incr(generation_key(tag))
+                    pipe.expire(generation_key(tag), settings.CACHE_GENERATION_TTL)
+                    pipe.publish(self.channel, tag)
+                await pipe.execute()
+        except RedisError as e:
+            # Local copies still expire on their own TTL
+            logger.warning("Cache invalidation failed: %s", e)
+
+    def invalidate_sync(self, tags: Iterable[str]) -> None:
+        """Invalidate from synchronous code paths (CRUD, Celery tasks)"""
+        tags = list(tags)
+        redis = self.redis.get_sync_connection()
+        try:
+            with redis.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.smembers(tag_index_key(tag))
+                members = pipe.execute()
+                for tag, keys in zip(tags, members):
+                    pipe.delete(tag_index_key(tag), *keys)
+                    pipe.incr(generation_key(tag))
+                    pipe.expire(generation_key(tag), settings.CACHE_GENERATION_TTL)
+                    pipe.publish(self.channel, tag)
+                pipe.execute()
+        except RedisError as e:
+            # Local copies still expire on their own TTL
+            logger.warning("Cache invalidation failed: %s", e)
+
+    async def publish(self, name: str) -> None:
+        """
+        Drop ``name`` from the local caches of every other process; the
+        caller takes care of its own
+        """
+        redis = await self.redis.get_connection()
+        await redis.publish(self.channel, f"{self.origin} {name}")
+
+    def _dispatch(self, name: Optional[str]) -> None:
+        for handler in self._handlers:
+            handler(name)
+
+    def _receive(self, data: str) -> None:
+        origin, sep, name = data.partition(" ")
+        if not sep:
+            self._dispatch(data)
+        elif origin != self.origin:
+            self._dispatch(name)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                redis = await self.redis.get_connection()
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    # Anything published while we were disconnected is lost
+                    self._dispatch(None)
+                    while True:
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True, timeout=1.0
+                        )
+                        if message is not None:
+                            self._receive(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except RedisError as e:
+                logger.warning("Cache invalidation listener lost Redis: %s", e)
+                await asyncio.sleep(1)
+
+    def start(self) -> None:
+        """Startup hook for processes that keep local caches"""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.cancel()
+            try:
+                await listener
+            except asyncio.CancelledError:
+                pass
+
+
+invalidation_bus = InvalidationBus(
+    redis_client, channel=settings.CACHE_INVALIDATION_CHANNEL
+)
@@ -1,10 +1,13 @@
+import asyncio
 from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
 from app.core.config import settings
 
 celery_app = Celery(
     "worker",
     broker=f"redis://:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:{settings.REDIS_PORT}/1",
     backend=f"redis://:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:{settings.REDIS_PORT}/2",
+    include=["app.tasks.webhooks", "app.tasks.maintenance"],
 )
 
 celery_app.conf.update(
@@ -32,12 +35,17 @@ celery_app.conf.update(
             "exchange": "analysis",
             "routing_key": "analysis",
         },
+        "webhooks": {
+            "exchange": "webhooks",
+            "routing_key": "webhooks",
+        },
     },
     # Routing
     task_routes={
         "app.tasks.analysis.parse_website": {"queue": "parsing"},
         "app.tasks.analysis.run_analysis": {"queue": "analysis"},
         "app.tasks.analysis.generate_recommendations": {"queue": "analysis"},
+        "app.tasks.webhooks.*": {"queue": "webhooks"},
     },
     # Result backend settings
     result_expires=60 * 60 * 24,  # 24 hours
@@ -45,7 +53,16 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
     # Beat settings (for periodic tasks)
-    beat_schedule={},
+    beat_schedule={
+        "dispatch-webhooks": {
+            "task": "app.tasks.webhooks.dispatch_webhooks",
+            "schedule": settings.WEBHOOK_DISPATCH_INTERVAL,
+        },
+        "maintain-event-partitions": {
+            "task": "app.tasks.maintenance.maintain_event_partitions",
+            "schedule": settings.EVENT_PARTITION_MAINTENANCE_INTERVAL,
+        },
+    },
 )
 
 # Optional: configure Celery logging
@@ -54,3 +71,44 @@ celery_app.conf.update(
     worker_log_format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     worker_task_log_format="%(asctime)s - %(name)s - %(levelname)s - %(task_name)s[%(task_id)s] - %(message)s",
 )
+
+
+_worker_loop = None
+
+
+def run_async(coro):
+    """
+    Run a coroutine on the worker process's persistent event loop, so pooled
+    clients (HTTP sessions, Redis connections) survive between tasks
+    """
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+    return _worker_loop.run_until_complete(coro)
+
+
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    """
+    Serve worker metrics from the main worker process. Prefork children
+    only show up when PROMETHEUS_MULTIPROC_DIR is set.
+    """
+    if settings.METRICS_WORKER_PORT:
+        from prometheus_client import start_http_server
+        from app.core.metrics import metrics_registry
+
+        start_http_server(settings.METRICS_WORKER_PORT, registry=metrics_registry())
+
+
+@worker_process_shutdown.connect
+def close_worker_clients(**kwargs):
+    from app.core.http import http_client
+    from app.core.metrics import mark_process_dead
+    from app.core.redis import redis_client
+
+    mark_process_dead()
+
+    if _worker_loop is not None and not _worker_loop.is_closed():
+        _worker_loop.run_until_complete(http_client.close())
+        _worker_loop.run_until_complete(redis_client.close())
+        _worker_loop.close()
@@ -42,16 +42,39 @@ class Settings(BaseSettings):
             path=values.data.get("POSTGRES_DB") or "",
         )
 
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    @field_validator("ASYNC_DATABASE_URL")
+    def assemble_async_db_connection(
+        cls, v: Optional[str], values: ValidationInfo
+    ) -> Any:
+        if isinstance(v, str):
+            return v
+        _, _, rest = str(values.data.get("DATABASE_URL")).partition("://")
+        return f"postgresql+asyncpg://{rest}"
+
+    # Metrics (the API serves /metrics; Celery workers export on this port)
+    METRICS_WORKER_PORT: Optional[int] = 9540
+
     # Redis
     REDIS_HOST: str
     REDIS_PORT: int
     REDIS_PASSWORD: Optional[str] = None
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 5.0  # seconds to wait for a free connection
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
 
     # Security
     ALGORITHM: str = "HS256"
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+    USER_CACHE_TTL: int = 60
+    USER_CACHE_LOCAL_TTL: int = 5
+    USER_CACHE_MAX_ENTRIES: int = 10000
 
     # Email
     SMTP_TLS: bool = True
@@ -66,6 +89,93 @@ class Settings(BaseSettings):
 
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_WINDOW: int = 60
+    # "sliding_window_log", "sliding_window_counter" or "token_bucket"
+    RATE_LIMIT_ALGORITHM: str = "sliding_window_counter"
+    # Requests per window by subscription tier; unknown tiers get the default
+    RATE_LIMIT_TIERS: Dict[str, int] = {"free": 60, "pro": 300, "enterprise": 1200}
+    # Per-process pre-filter: share of the limit a process may admit between
+    # syncs with Redis, which bounds how far the global limit can overshoot
+    RATE_LIMIT_LOCAL_ENABLED: bool = True
+    RATE_LIMIT_LOCAL_SYNC_MS: int = 250
+    RATE_LIMIT_LOCAL_OVERSHOOT: float = 0.1
+
+    # HTTP client
+    HTTP_POOL_SIZE: int = 100
+    HTTP_POOL_SIZE_PER_HOST: int = 10
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_KEEPALIVE_TIMEOUT: float = 30.0
+    HTTP_TIMEOUT: float = 30.0
+    HTTP_CONNECT_TIMEOUT: float = 10.0
+    HTTP_USER_AGENT: str = "SiteBoost/0.1"
+
+    # Parsing
+    HTML_STREAMING_PARSER: bool = True
+    HTML_PARSER_CHUNK_SIZE: int = 64 * 1024
+
+    # Blob storage
+    BLOB_STORE_BACKEND: str = "local"  # "local" or "postgres"
+    BLOB_STORE_PATH: str = "/var/lib/siteboost/blobs"
+    BLOB_STORE_COMPRESSION: str = "zstd"  # "zstd" or "gzip"
+
+    # Result cache
+    CACHE_SERIALIZER: str = "orjson"  # "orjson" or "msgpack"
+    CACHE_COMPRESSION: str = "zstd"  # "zstd" or "none"
+    CACHE_COMPRESS_MIN_BYTES: int = 1024
+    CACHE_STALE_TTL: int = 300  # serve expired entries while refreshing
+    CACHE_EARLY_REFRESH_BETA: float = 1.0  # >1 refreshes earlier, 0 disables
+    CACHE_LOCK_TIMEOUT: float = 10.0
+    CACHE_LOCK_WAIT: float = 2.0
+    CACHE_L1_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_L1_TTL: int = 300
+    CACHE_INVALIDATION_CHANNEL: str = "cache_invalidation"
+    # Lifetime of the write generations that keep slow loads from storing
+    # outdated values; must exceed the longest load
+    CACHE_GENERATION_TTL: int = 3600
+    # Cache-Control of analysis results; in-progress ones are revalidated
+    # with their ETag on every poll
+    ANALYSIS_CACHE_CONTROL_IN_PROGRESS: str = "private, no-cache"
+    ANALYSIS_CACHE_CONTROL_FINISHED: str = "private, max-age=3600"
+
+    # Fetch cache
+    FETCH_CACHE_ENABLED: bool = True
+    FETCH_CACHE_TTL: int = 7 * 24 * 60 * 60
+
+    # Fetch limits
+    FETCH_MAX_BODY_BYTES: int = 10 * 1024 * 1024
+    FETCH_MAX_DECOMPRESSED_BYTES: int = 20 * 1024 * 1024
+    FETCH_ALLOWED_CONTENT_TYPES: List[str] = [
+        "text/html",
+        "application/xhtml+xml",
+    ]
+
+    # Webhooks
+    WEBHOOK_CONCURRENCY: int = 20
+    WEBHOOK_TIMEOUT: float = 10.0
+    # Backoff defaults; a config's retry_strategy may override base_delay,
+    # max_delay and multiplier
+    WEBHOOK_RETRY_BASE_DELAY: float = 10.0
+    WEBHOOK_RETRY_MAX_DELAY: float = 60 * 60
+    WEBHOOK_RETRY_MULTIPLIER: float = 2.0
+    # Outbox dispatcher
+    WEBHOOK_DISPATCH_BATCH_SIZE: int = 100
+    WEBHOOK_DISPATCH_MAX_BATCHES: int = 10
+    WEBHOOK_DISPATCH_INTERVAL: int = 5
+    WEBHOOK_BREAKER_FAILURE_THRESHOLD: int = 5
+    WEBHOOK_BREAKER_RESET_TIMEOUT: float = 60.0
+    # Default cap on events per request for configs with batching enabled
+    WEBHOOK_BATCH_MAX_SIZE: int = 100
+    # Stored response bodies are truncated to this size
+    WEBHOOK_RESPONSE_BODY_MAX_BYTES: int = 4096
+    # Deprecated: requests are signed with X-Webhook-Signature. Only enable
+    # for receivers that still compare the plain X-Webhook-Secret header.
+    WEBHOOK_SEND_SECRET_HEADER: bool = False
+
+    # Event retention (analysis_events and webhook_deliveries are
+    # partitioned by month; whole partitions are dropped)
+    EVENT_RETENTION_DAYS: int = 90
+    EVENT_PARTITION_PREMAKE_MONTHS: int = 3
+    EVENT_PARTITION_MAINTENANCE_INTERVAL: int = 24 * 60 * 60
 
     @field_validator("EMAILS_FROM_EMAIL")
     def validate_email(cls, v: Optional[str]) -> Optional[str]:
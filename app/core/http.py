@@ -0,0 +1,55 @@
+import asyncio
+import codecs
+from typing import Optional
+import aiohttp
+from app.core.config import settings
+
+
+def known_charset(charset: Optional[str]) -> Optional[str]:
+    """The declared charset if Python can decode it, else None"""
+    if not charset:
+        return None
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        return None
+    return charset
+
+
+class HTTPClient:
+    """Process-wide pooled aiohttp session shared by fetches and webhooks"""
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is not None and self._loop is not loop:
+            # Sessions are bound to the loop that created them; the old loop
+            # may already be gone, so the stale session is simply dropped
+            self._session = None
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=settings.HTTP_POOL_SIZE,
+                    limit_per_host=settings.HTTP_POOL_SIZE_PER_HOST,
+                    ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+                    keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    total=settings.HTTP_TIMEOUT,
+                    connect=settings.HTTP_CONNECT_TIMEOUT,
+                ),
+                headers={"User-Agent": settings.HTTP_USER_AGENT},
+            )
+            self._loop = loop
+        return self._session
+
+    async def close(self):
+        session, self._session, self._loop = self._session, None, None
+        if session is not None and not session.closed:
+            await session.close()
+
+
+http_client = HTTPClient()
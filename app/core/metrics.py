@@ -0,0 +1,71 @@
+import os
+from typing import Callable, Dict, Iterable, Optional
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+
+# Set for Celery prefork workers or multi-process API servers, so every
+# process writes its samples to a shared directory
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# Page fetching
+FETCH_LIMIT_TRIPS = Counter(
+    "siteboost_fetch_limit_trips_total",
+    "Page fetches aborted because a size or content-type limit tripped",
+    ["limit"],
+)
+FETCH_BODY_BYTES = Histogram(
+    "siteboost_fetch_body_bytes",
+    "Decompressed size of fetched page bodies",
+    buckets=(16e3, 64e3, 256e3, 1e6, 4e6, 16e6, 64e6),
+)
+
+
+class PoolCollector(Collector):
+    """
+    Gauge read from the pool at scrape time. Pool state belongs to one
+    process, so in multiprocess mode this reports the process serving the
+    scrape rather than an aggregate.
+    """
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.stats: Optional[Callable[[], Dict[str, int]]] = None
+
+    def collect(self) -> Iterable[Metric]:
+        gauge = GaugeMetricFamily(self.name, self.documentation, labels=["state"])
+        if self.stats is not None:
+            for state, value in self.stats().items():
+                gauge.add_metric([state], value)
+        yield gauge
+
+
+# Redis
+REDIS_POOL_CONNECTIONS = PoolCollector(
+    "siteboost_redis_pool_connections",
+    "Connections in the shared Redis pool, by state (in_use, idle, max)",
+)
+REGISTRY.register(REDIS_POOL_CONNECTIONS)
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Registry to export; in multiprocess mode it aggregates all processes"""
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(REDIS_POOL_CONNECTIONS)
+    return registry
+
+
+def mark_process_dead() -> None:
+    """Shutdown hook for processes that write multiprocess samples"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,125 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+from redis.exceptions import RedisError
+from app.core.cache_invalidation import generation_key, invalidation_bus
+from app.core.config import settings
+from app.core.read_through_cache import STORE_IF_CURRENT_SCRIPT
+from app.core.redis import RedisClient, redis_client
+from app.schemas.user import UserPrincipal
+
+logger = logging.getLogger(__name__)
+
+
+class PrincipalCache:
+    """
+    Two-level cache of authenticated users: a small in-process LRU in front
+    of Redis. Other processes drop their local copies when the invalidation
+    bus reports a change to the user row.
+
+    Invalidation bumps a per-user generation counter. Callers read it with
+    ``generation`` before loading the user, and ``set`` stores the loaded
+    principal only if it has not moved since, so a request that loaded the
+    user before a deactivation cannot cache the stale row again.
+    """
+
+    def __init__(
+        self,
+        redis: RedisClient,
+        prefix: str = "user_principal",
+        ttl: int = 60,
+        local_ttl: int = 5,
+        max_entries: int = 10000,
+    ):
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.max_entries = max_entries
+        self._local: "OrderedDict[str, Tuple[float, UserPrincipal]]" = OrderedDict()
+
+    def _key(self, user_id: Any) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    async def get(self, user_id: Any) -> Optional[UserPrincipal]:
+        user_id = str(user_id)
+        entry = self._local.get(user_id)
+        if entry is not None:
+            expires_at, principal = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(user_id)
+                return principal
+            del self._local[user_id]
+
+        try:
+            raw = await self.redis.get(self._key(user_id))
+        except RedisError as e:
+            # Treat an unavailable Redis as a miss and load from the database
+            logger.warning("Principal cache read failed: %s", e)
+            return None
+        if raw is None:
+            return None
+        principal = UserPrincipal.model_validate_json(raw)
+        self._remember(user_id, principal)
+        return principal
+
+    async def generation(self, user_id: Any) -> Optional[str]:
+        """Snapshot to pass to ``set``; take it before loading the user"""
+        try:
+            return await self.redis.get(generation_key(self._key(user_id)))
+        except RedisError as e:
+            logger.warning("Principal cache read failed: %s", e)
+            return None
+
+    async def set(self, principal: UserPrincipal, generation: Optional[str]) -> None:
+        """Cache a loaded principal unless the user was invalidated meanwhile"""
+        key = self._key(principal.id)
+        try:
+            redis = await self.redis.get_connection()
+            stored = await STORE_IF_CURRENT_SCRIPT(
+                redis,
+                [key, generation_key(key)],
+                [principal.model_dump_json(), self.ttl, 1, generation or ""],
+            )
+        except RedisError as e:
+            logger.warning("Principal cache write failed: %s", e)
+            stored = True
+        if stored:
+            self._remember(str(principal.id), principal)
+
+    def invalidate(self, user_id: Any) -> None:
+        """Forget a user after any change to their account"""
+        self._local.pop(str(user_id), None)
+        key = self._key(user_id)
+        try:
+            with self.redis.get_sync_connection().pipeline(transaction=False) as pipe:
+                pipe.incr(generation_key(key))
+                pipe.expire(generation_key(key), settings.CACHE_GENERATION_TTL)
+                pipe.delete(key)
+                pipe.execute()
+        except RedisError as e:
+            # The shared copy still expires on its own TTL
+            logger.warning("Principal cache invalidation failed: %s", e)
+
+    def drop_local(self, name: Optional[str]) -> None:
+        """Invalidation bus handler: forget local copies of changed users"""
+        if name is None:
+            self._local.clear()
+        elif name.startswith("user:"):
+            self._local.pop(name[len("user:") :], None)
+
+    def _remember(self, user_id: str, principal: UserPrincipal) -> None:
+        self._local[user_id] = (time.monotonic() + self.local_ttl, principal)
+        self._local.move_to_end(user_id)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+
+principal_cache = PrincipalCache(
+    redis_client,
+    ttl=settings.USER_CACHE_TTL,
+    local_ttl=settings.USER_CACHE_LOCAL_TTL,
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+)
+invalidation_bus.subscribe(principal_cache.drop_local)
@@ -1,55 +1,182 @@
-from datetime import datetime
-from app.core.redis import RedisClient
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.redis import LuaScript, RedisClient, redis_client
+
+SLIDING_WINDOW_LOG = "sliding_window_log"
+SLIDING_WINDOW_COUNTER = "sliding_window_counter"
+TOKEN_BUCKET = "token_bucket"
+
+logger = logging.getLogger(__name__)
+
+# Every script takes KEYS[1] = bucket key and ARGV = limit, window (seconds),
+# cost, flushed, and returns {allowed, remaining, retry_after_ms}. ``flushed``
+# units were already admitted by a local limiter and are recorded
+# unconditionally before ``cost`` is checked. Time comes from the Redis
+# server so that all API workers share one clock. A cost of 0 peeks.
+
+SLIDING_WINDOW_LOG_SCRIPT = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2]) * 1000
+local cost = tonumber(ARGV[3])
+local flushed = tonumber(ARGV[4] or '0')
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local member = t[1] .. '.' .. t[2] .. '-'
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+for i = 1, flushed do
+    redis.call('ZADD', key, now, member .. (count + i))
+end
+count = count + flushed
+
+local allowed = count + cost <= limit
+local retry = 0
+if allowed then
+    for i = 1, cost do
+        redis.call('ZADD', key, now, member .. (count + i))
+    end
+    count = count + cost
+else
+    retry = window
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    if oldest[2] then
+        retry = tonumber(oldest[2]) + window - now
+    end
+end
+redis.call('PEXPIRE', key, window)
+return {allowed and 1 or 0, math.max(limit - count, 0), retry}
+"""
+
+SLIDING_WINDOW_COUNTER_SCRIPT = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local flushed = tonumber(ARGV[4] or '0')
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local current_start = math.floor(now / window) * window
+
+local state = redis.call('HMGET', key, 'start', 'current', 'previous')
+local start = tonumber(state[1]) or current_start
+local current = tonumber(state[2]) or 0
+local previous = tonumber(state[3]) or 0
+if start ~= current_start then
+    if start == current_start - window then
+        previous = current
+    else
+        previous = 0
+    end
+    current = 0
+end
+current = current + flushed
+
+local elapsed = now - current_start
+local estimated = previous * (window - elapsed) / window + current
+local allowed = estimated + cost <= limit
+local retry = 0
+if allowed then
+    current = current + cost
+    estimated = estimated + cost
+else
+    retry = window - elapsed
+    local headroom = limit - current - cost
+    if previous > 0 and headroom >= 0 then
+        retry = (1 - headroom / previous) * window - elapsed
+    end
+end
+redis.call('HSET', key, 'start', current_start, 'current', current,
+    'previous', previous)
+redis.call('PEXPIRE', key, window * 2000)
+return {allowed and 1 or 0, math.max(math.floor(limit - estimated), 0),
+    math.ceil(retry * 1000)}
+"""
+
+TOKEN_BUCKET_SCRIPT = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local flushed = tonumber(ARGV[4] or '0')
+local rate = limit / window
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', key, 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or limit
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(limit, tokens + math.max(now - updated_at, 0) * rate)
+-- Locally admitted units may drive the bucket into debt
+tokens = tokens - flushed
+
+local allowed = tokens >= cost
+local retry = 0
+if allowed then
+    tokens = tokens - cost
+else
+    retry = math.ceil((cost - tokens) / rate * 1000)
+end
+redis.call('HSET', key, 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('PEXPIRE', key, window * 1000)
+return {allowed and 1 or 0, math.max(math.floor(tokens), 0), retry}
+"""
 
 
 class RateLimitExceeded(Exception):
     pass
 
 
-async def check_rate_limit(
-    redis: RedisClient,
-    user_id: str,
-    limit: int = 60,  # requests per minute
-    window: int = 60,  # window in seconds
-) -> bool:
-    """
-    Check if the user has exceeded their rate limit.
-    Uses a sliding window counter implementation.
-    """
-    current_timestamp = datetime.utcnow().timestamp()
-    window_start = current_timestamp - window
+SCRIPTS = {
+    SLIDING_WINDOW_LOG: LuaScript(SLIDING_WINDOW_LOG_SCRIPT),
+    SLIDING_WINDOW_COUNTER: LuaScript(SLIDING_WINDOW_COUNTER_SCRIPT),
+    TOKEN_BUCKET: LuaScript(TOKEN_BUCKET_SCRIPT),
+}
 
-    # Key for storing user's request timestamps
-    key = f"rate_limit:{user_id}"
 
-    async def cleanup_old_requests():
-        """Remove requests older than the window"""
-        redis_conn = await redis.get_connection()
-        await redis_conn.zremrangebyscore(key, "-inf", window_start)
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # seconds until the request would be allowed
 
-    async def add_request():
-        """Add current request to the sorted set"""
-        redis_conn = await redis.get_connection()
-        pipeline = redis_conn.pipeline()
-        pipeline.zadd(key, {str(current_timestamp): current_timestamp})
-        pipeline.expire(key, window * 2)  # Set TTL for the key
-        await pipeline.execute()
+    def __bool__(self) -> bool:
+        return self.allowed
 
-    async def get_request_count():
-        """Get the number of requests in the current window"""
-        redis_conn = await redis.get_connection()
-        return await redis_conn.zcount(key, window_start, "+inf")
 
-    # Execute rate limiting logic
-    await cleanup_old_requests()
-    await add_request()
-    request_count = await get_request_count()
+def tier_limit(tier: Optional[str]) -> int:
+    """Requests per window allowed for a subscription tier"""
+    return settings.RATE_LIMIT_TIERS.get(tier or "", settings.RATE_LIMIT_PER_MINUTE)
 
-    return request_count <= limit
+
+async def check_rate_limit(
+    user_id: str,
+    limit: Optional[int] = None,
+    window: Optional[int] = None,
+    tier: Optional[str] = None,
+) -> RateLimitResult:
+    """
+    Check if the user has exceeded their rate limit.
+    The limit defaults to the one configured for the user's subscription tier.
+    """
+    return await user_limiter.hit(
+        str(user_id), limit=limit or tier_limit(tier), window=window
+    )
 
 
 class RateLimiter:
-    """Rate limiter class for more complex rate limiting scenarios"""
+    """
+    Rate limiter class for more complex rate limiting scenarios.
+    Each check is a single atomic EVALSHA round trip.
+    """
 
     def __init__(
         self,
@@ -57,65 +184,276 @@ class RateLimiter:
         prefix: str = "rate_limit",
         default_limit: int = 60,
         default_window: int = 60,
+        algorithm: Optional[str] = None,
     ):
         self.redis = redis
         self.prefix = prefix
         self.default_limit = default_limit
         self.default_window = default_window
+        self.algorithm = algorithm or settings.RATE_LIMIT_ALGORITHM
+        if self.algorithm not in SCRIPTS:
+            raise ValueError(f"Unknown rate limit algorithm: {self.algorithm}")
 
-    async def is_allowed(self, key: str, limit: int = None, window: int = None) -> bool:
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{self.algorithm}:{key}"
+
+    async def hit(
+        self,
+        key: str,
+        limit: int = None,
+        window: int = None,
+        cost: int = 1,
+        flushed: int = 0,
+    ) -> RateLimitResult:
         """
-        Check if the request is allowed based on rate limiting rules
+        Consume ``cost`` units for key, if the limit allows it.
+        ``flushed`` units are recorded regardless of the outcome.
         """
         limit = limit or self.default_limit
         window = window or self.default_window
 
-        redis_key = f"{self.prefix}:{key}"
-        current_time = datetime.utcnow().timestamp()
+        redis = await self.redis.get_connection()
+        allowed, remaining, retry_after_ms = await SCRIPTS[self.algorithm](
+            redis, [self._key(key)], [limit, window, cost, flushed]
+        )
+        return RateLimitResult(
+            allowed=bool(allowed),
+            limit=limit,
+            remaining=int(remaining),
+            retry_after=int(retry_after_ms) / 1000,
+        )
+
+    async def is_allowed(self, key: str, limit: int = None, window: int = None) -> bool:
+        """
+        Check if the request is allowed based on rate limiting rules
+        """
+        result = await self.hit(key, limit=limit, window=window)
+        return result.allowed
+
+    async def get_remaining(self, key: str) -> int:
+        """Get remaining requests allowed"""
+        result = await self.hit(key, cost=0)
+        return result.remaining
+
+    async def reset(self, key: str) -> bool:
+        """Reset rate limit counter for key"""
+        return await self.redis.delete(self._key(key))
+
+
+@dataclass
+class LocalBucket:
+    remaining: int = 0  # global budget left at the last sync
+    pending: int = 0  # admitted locally, not yet reported to Redis
+    synced_at: float = 0.0
+    retry_at: float = 0.0  # refuse locally until then, without asking Redis
+    limit: Optional[int] = None  # as of the last hit, for background flushes
+    window: Optional[int] = None
+
+
+class LocalRateLimiter:
+    """
+    Two-tier limiter: an in-process bucket per key in front of a shared
+    RateLimiter. Between syncs a process admits up to ``overshoot`` of the
+    limit on its own (never more than the global budget it last saw), and
+    reports those units to Redis with the next check. With N processes the
+    global limit can be exceeded by at most N * overshoot * limit.
+
+    Keys that go quiet would otherwise hold their units back indefinitely,
+    so ``start`` runs a background flush that reports units pending for
+    longer than the sync interval.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        sync_interval: Optional[float] = None,
+        overshoot: Optional[float] = None,
+        max_keys: int = 10000,
+    ):
+        self.limiter = limiter
+        self.sync_interval = (
+            sync_interval
+            if sync_interval is not None
+            else settings.RATE_LIMIT_LOCAL_SYNC_MS / 1000
+        )
+        self.overshoot = (
+            overshoot if overshoot is not None else settings.RATE_LIMIT_LOCAL_OVERSHOOT
+        )
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, LocalBucket]" = OrderedDict()
+        # Pending units of evicted buckets, reported by the next flush
+        self._evicted: Dict[str, Tuple[int, Optional[int], Optional[int]]] = {}
+        self._flusher: Optional[asyncio.Task] = None
+
+    def _local_budget(self, limit: int) -> int:
+        return int(limit * self.overshoot) if settings.RATE_LIMIT_LOCAL_ENABLED else 0
+
+    async def hit(
+        self, key: str, limit: int = None, window: int = None, cost: int = 1
+    ) -> RateLimitResult:
+        """
+        Consume ``cost`` units for key, locally when the budget allows
+        """
+        limit = limit or self.limiter.default_limit
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = LocalBucket()
+            if len(self._buckets) > self.max_keys:
+                self._evict(*self._buckets.popitem(last=False))
+        else:
+            self._buckets.move_to_end(key)
+            if now < bucket.retry_at:
+                return RateLimitResult(False, limit, 0, bucket.retry_at - now)
+            budget = min(bucket.remaining, self._local_budget(limit))
+            if (
+                now - bucket.synced_at < self.sync_interval
+                and bucket.pending + cost <= budget
+            ):
+                bucket.pending += cost
+                return RateLimitResult(
+                    True, limit, bucket.remaining - bucket.pending, 0
+                )
+
+        # Take the pending units before awaiting, so that concurrent syncs
+        # never report them twice
+        flushed, bucket.pending = bucket.pending, 0
+        try:
+            result = await self.limiter.hit(
+                key, limit=limit, window=window, cost=cost, flushed=flushed
+            )
+        except RedisError:
+            # Hand the units back, so the next sync reports them
+            bucket.pending += flushed
+            raise
+        bucket.remaining = result.remaining
+        bucket.synced_at = time.monotonic()
+        bucket.retry_at = 0.0 if result.allowed else now + result.retry_after
+        bucket.limit, bucket.window = limit, window
+        return result
+
+    def _evict(self, key: str, bucket: LocalBucket) -> None:
+        if bucket.pending:
+            pending = self._evicted.get(key, (0, None, None))[0] + bucket.pending
+            self._evicted[key] = (pending, bucket.limit, bucket.window)
+
+    async def flush(self, force: bool = False) -> None:
+        """
+        Report units that have been pending for a full sync interval, or all
+        pending units when ``force`` is set
+        """
+        now = time.monotonic()
+        due = [
+            (key, bucket, bucket.pending, bucket.limit, bucket.window)
+            for key, bucket in self._buckets.items()
+            if bucket.pending
+            and (force or now - bucket.synced_at >= self.sync_interval)
+        ]
+        due += [(key, None, *unreported) for key, unreported in self._evicted.items()]
+        self._evicted.clear()
 
-        # Get current count
-        count = await self.redis.get(redis_key) or 0
-        count = int(count)
+        for key, bucket, pending, limit, window in due:
+            # Same hand-off as hit(): claim the units before awaiting
+            if bucket is not None:
+                pending, bucket.pending = bucket.pending, 0
+                if not pending:
+                    continue
+            try:
+                result = await self.limiter.hit(
+                    key, limit=limit, window=window, cost=0, flushed=pending
+                )
+            except RedisError as e:
+                logger.warning("Rate limit flush failed for %s: %s", key, e)
+                if bucket is not None:
+                    bucket.pending += pending
+                else:
+                    self._evict(
+                        key, LocalBucket(pending=pending, limit=limit, window=window)
+                    )
+                continue
+            if bucket is not None:
+                bucket.remaining = result.remaining
+                bucket.synced_at = time.monotonic()
 
-        if count >= limit:
-            return False
+    async def _flush_forever(self) -> None:
+        while True:
+            await asyncio.sleep(max(self.sync_interval, 0.05))
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Rate limit flush failed")
 
-        # Increment count
-        pipeline = await self.redis.get_connection()
-        async with pipeline.pipeline() as pipe:
-            await pipe.incr(redis_key)
-            await pipe.expire(redis_key, window)
-            await pipe.execute()
+    def start(self) -> None:
+        """Startup hook: report idle keys' pending units in the background"""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_forever())
 
-        return True
+    async def stop(self) -> None:
+        flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            flusher.cancel()
+            try:
+                await flusher
+            except asyncio.CancelledError:
+                pass
+        await self.flush(force=True)
+
+    async def is_allowed(self, key: str, limit: int = None, window: int = None) -> bool:
+        """
+        Check if the request is allowed based on rate limiting rules
+        """
+        result = await self.hit(key, limit=limit, window=window)
+        return result.allowed
 
     async def get_remaining(self, key: str) -> int:
         """Get remaining requests allowed"""
-        redis_key = f"{self.prefix}:{key}"
-        count = await self.redis.get(redis_key) or 0
-        return max(0, self.default_limit - int(count))
+        bucket = self._buckets.get(key)
+        remaining = await self.limiter.get_remaining(key)
+        return max(0, remaining - (bucket.pending if bucket else 0))
 
     async def reset(self, key: str) -> bool:
         """Reset rate limit counter for key"""
-        redis_key = f"{self.prefix}:{key}"
-        return await self.redis.delete(redis_key)
+        self._buckets.pop(key, None)
+        self._evicted.pop(key, None)
+        return await self.limiter.reset(key)
+
 
+user_limiter = LocalRateLimiter(
+    RateLimiter(
+        redis=redis_client,
+        prefix="rate_limit",
+        default_limit=settings.RATE_LIMIT_PER_MINUTE,
+        default_window=settings.RATE_LIMIT_WINDOW,
+    )
+)
 
 # Custom rate limiters for different scenarios
-api_limiter = RateLimiter(
-    redis=RedisClient(), prefix="api_rate_limit", default_limit=60, default_window=60
+api_limiter = LocalRateLimiter(
+    RateLimiter(
+        redis=redis_client,
+        prefix="api_rate_limit",
+        default_limit=60,
+        default_window=60,
+    )
 )
 
-analysis_limiter = RateLimiter(
-    redis=RedisClient(),
-    prefix="analysis_rate_limit",
-    default_limit=10,  # Lower limit for analysis requests
-    default_window=60,
+analysis_limiter = LocalRateLimiter(
+    RateLimiter(
+        redis=redis_client,
+        prefix="analysis_rate_limit",
+        default_limit=10,  # Lower limit for analysis requests
+        default_window=60,
+    )
 )
 
-webhook_limiter = RateLimiter(
-    redis=RedisClient(),
-    prefix="webhook_rate_limit",
-    default_limit=100,
-    default_window=60,
+webhook_limiter = LocalRateLimiter(
+    RateLimiter(
+        redis=redis_client,
+        prefix="webhook_rate_limit",
+        default_limit=100,
+        default_window=60,
+    )
 )
+
+# Limiters whose background flush runs for the lifetime of the API process
+local_limiters = (user_limiter, api_limiter, analysis_limiter, webhook_limiter)
@@ -0,0 +1,297 @@
+import asyncio
+import logging
+import math
+import random
+import struct
+import time
+import uuid
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+from app.core.cache_invalidation import InvalidationBus, generation_key, tag_index_key
+from app.core.config import settings
+from app.core.local_cache import LocalCache
+from app.core.redis import LuaScript, RedisClient
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# soft expiry (epoch seconds), recompute time (seconds)
+ENVELOPE = struct.Struct(">dd")
+
+RELEASE_LOCK_SCRIPT = LuaScript("""
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+""")
+
+# KEYS = entry key, n generation keys, tag index keys; ARGV = envelope,
+# expire (seconds), n, the n generations seen before loading. Stores the
+# entry only if none of the generations moved since.
+STORE_IF_CURRENT_SCRIPT = LuaScript("""
+local n = tonumber(ARGV[3])
+for i = 1, n do
+    if (redis.call('GET', KEYS[i + 1]) or '') ~= ARGV[i + 3] then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+for i = n + 2, #KEYS do
+    redis.call('SADD', KEYS[i], KEYS[1])
+    redis.call('EXPIRE', KEYS[i], ARGV[2])
+end
+return 1
+""")
+
+
+def _identity(value: bytes) -> bytes:
+    return value
+
+
+class ReadThroughCache(Generic[T]):
+    """
+    Read-through cache with stampede protection.
+
+    - Concurrent misses for a key share one load per process, and a Redis
+      lock lets only one process rebuild it while the others wait for the
+      result.
+    - Entries are refreshed in the background before they expire, with a
+      probability that grows as expiry nears and with the cost of the last
+      rebuild (probabilistic early expiration, "XFetch").
+    - For ``stale_ttl`` seconds after expiry the old value is still served
+      while a single background refresh runs.
+
+    With a ``local`` cache, decoded values are also kept in process (L1).
+    Entries are indexed under their ``tags`` in Redis, and the ``bus``
+    removes stale copies from every process when a tag is invalidated.
+
+    Writes and invalidations bump generation counters for the key and its
+    tags. A load stores its result only if they have not moved since it
+    started, so a slow load cannot overwrite newer data.
+    """
+
+    def __init__(
+        self,
+        redis: RedisClient,
+        ttl: int,
+        stale_ttl: Optional[int] = None,
+        beta: Optional[float] = None,
+        lock_timeout: Optional[float] = None,
+        lock_wait: Optional[float] = None,
+        local: Optional[LocalCache] = None,
+        bus: Optional[InvalidationBus] = None,
+    ):
+        self.redis = redis
+        self.ttl = ttl
+        self.stale_ttl = (
+            stale_ttl if stale_ttl is not None else settings.CACHE_STALE_TTL
+        )
+        self.beta = beta if beta is not None else settings.CACHE_EARLY_REFRESH_BETA
+        self.lock_timeout = lock_timeout or settings.CACHE_LOCK_TIMEOUT
+        self.lock_wait = lock_wait or settings.CACHE_LOCK_WAIT
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.local = local
+        self.bus = bus
+        if local is not None and bus is not None:
+            bus.subscribe(local.invalidate)
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Optional[bytes]]],
+        decode: Callable[[bytes], Optional[T]] = _identity,
+        tags: Iterable[str] = (),
+    ) -> Optional[T]:
+        """
+        Cached value for key, loading it on a miss. ``loader`` must not depend
+        on request-scoped resources, since it may run after the request ends.
+        Values that ``decode`` rejects (returns None for) count as misses.
+        """
+        tags = tuple(tags)
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not None:
+                return value
+
+        entry = await self._read(key)
+        if entry is not None:
+            soft_expiry, delta, payload = entry
+            value = decode(payload)
+            if value is not None:
+                now = time.time()
+                early = now - delta * self.beta * math.log(1 - random.random())
+                if early >= soft_expiry:
+                    self._refresh_in_background(key, loader, tags)
+                else:
+                    self._remember(key, value, len(payload), tags, soft_expiry)
+                return value
+
+        loaded = await self._load_once(key, loader, tags)
+        if loaded is None:
+            return None
+        payload, current = loaded
+        value = decode(payload)
+        if value is not None and current:
+            self._remember(key, value, len(payload), tags, time.time() + self.ttl)
+        return value
+
+    async def set(
+        self, key: str, payload: bytes, delta: float = 0.0, tags: Iterable[str] = ()
+    ) -> None:
+        """Store a value computed elsewhere, e.g. when a result is produced"""
+        envelope = ENVELOPE.pack(time.time() + self.ttl, delta) + payload
+        expire = self.ttl + self.stale_ttl
+        async with self.redis.pipeline() as pipe:
+            self._bump_generation(pipe, key)
+            pipe.set(key, envelope, ex=expire)
+            for tag in tags:
+                pipe.sadd(tag_index_key(tag), key)
+                pipe.expire(tag_index_key(tag), expire)
+        await self._forget(key)
+
+    async def delete(self, key: str) -> None:
+        async with self.redis.pipeline() as pipe:
+            self._bump_generation(pipe, key)
+            pipe.delete(key)
+        await self._forget(key)
+
+    @staticmethod
+    def _bump_generation(pipe, key: str) -> None:
+        pipe.incr(generation_key(key))
+        pipe.expire(generation_key(key), settings.CACHE_GENERATION_TTL)
+
+    async def _store_if_current(
+        self,
+        redis,
+        key: str,
+        payload: bytes,
+        delta: float,
+        tags: tuple,
+        generations: Sequence[Optional[str]],
+    ) -> bool:
+        """Store a loaded value unless the key or a tag was written meanwhile"""
+        envelope = ENVELOPE.pack(time.time() + self.ttl, delta) + payload
+        names = (key, *tags)
+        stored = await STORE_IF_CURRENT_SCRIPT(
+            redis,
+            [
+                key,
+                *(generation_key(name) for name in names),
+                *(tag_index_key(tag) for tag in tags),
+            ],
+            [
+                envelope,
+                self.ttl + self.stale_ttl,
+                len(names),
+                *(generation or "" for generation in generations),
+            ],
+        )
+        return bool(stored)
+
+    def _remember(
+        self, key: str, value: T, size: int, tags: tuple, soft_expiry: float
+    ) -> None:
+        if self.local is not None:
+            ttl = min(self.local.ttl, soft_expiry - time.time())
+            if ttl > 0:
+                self.local.set(key, value, size, tags=tags, ttl=ttl)
+
+    async def _forget(self, key: str) -> None:
+        """Drop local copies of key here and in every other process"""
+        if self.local is not None:
+            self.local.discard(key)
+        if self.bus is not None:
+            await self.bus.publish(key)
+
+    async def _read(self, key: str) -> Optional[tuple]:
+        raw = await self.redis.get_bytes(key)
+        if raw is None or len(raw) < ENVELOPE.size:
+            return None
+        soft_expiry, delta = ENVELOPE.unpack_from(raw)
+        return soft_expiry, delta, raw[ENVELOPE.size :]
+
+    def _refresh_in_background(self, key: str, loader, tags: tuple) -> None:
+        if key in self._inflight or key in self._refreshing:
+            return
+        task = asyncio.create_task(self._load(key, loader, tags, wait_for_peer=False))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda task: self._refresh_done(key, task))
+
+    def _refresh_done(self, key: str, task: asyncio.Task) -> None:
+        self._refreshing.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background cache refresh failed: %s", task.exception())
+
+    async def _load_once(self, key: str, loader, tags: tuple):
+        """Single-flight within the process"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader, tags, True))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _load(
+        self, key: str, loader, tags: tuple, wait_for_peer: bool
+    ) -> Optional[Tuple[bytes, bool]]:
+        """
+        Single-flight across processes. Returns the payload, and whether it is
+        still current and may be cached locally.
+        """
+        redis = await self.redis.get_connection()
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        acquired = await redis.set(
+            lock_key, token, nx=True, px=int(self.lock_timeout * 1000)
+        )
+        if not acquired:
+            if not wait_for_peer:
+                # Another process is already refreshing this entry
+                return None
+            payload = await self._wait_for_peer(key)
+            if payload is not None:
+                return payload, True
+            # The peer is slow or died; load without the lock
+
+        try:
+            generations = await redis.mget(
+                [generation_key(name) for name in (key, *tags)]
+            )
+            started = time.monotonic()
+            payload = await loader()
+            if payload is None:
+                return None
+            current = await self._store_if_current(
+                redis,
+                key,
+                payload,
+                time.monotonic() - started,
+                tags,
+                generations,
+            )
+            if current:
+                await self._forget(key)
+            return payload, current
+        finally:
+            if acquired:
+                await RELEASE_LOCK_SCRIPT(redis, [lock_key], [token])
+
+    async def _wait_for_peer(self, key: str) -> Optional[bytes]:
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            entry = await self._read(key)
+            if entry is not None and entry[0] > time.time():
+                return entry[2]
+        return None
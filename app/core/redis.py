@@ -1,42 +1,142 @@
-from typing import Optional, Any
+import asyncio
+import hashlib
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional, Sequence
+import redis as redis_sync
 from redis import asyncio as aioredis
+from redis.client import NEVER_DECODE
+from redis.exceptions import NoScriptError, RedisError
 from app.core.config import settings
+from app.core.metrics import REDIS_POOL_CONNECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+class LuaScript:
+    """Lua script invoked by SHA, loaded on first use or after a SCRIPT FLUSH"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.sha = hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+    async def __call__(self, redis, keys: Sequence[str], args: Sequence) -> list:
+        try:
+            return await redis.evalsha(self.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            await redis.script_load(self.source)
+            return await redis.evalsha(self.sha, len(keys), *keys, *args)
 
 
 class RedisClient:
+    """
+    Process-wide Redis manager. All callers share one blocking connection
+    pool (per event loop), so a saturated pool makes callers wait up to
+    REDIS_POOL_TIMEOUT instead of opening more connections.
+    """
+
     def __init__(self):
         self.redis_url = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}"
         if settings.REDIS_PASSWORD:
             self.redis_url = f"redis://:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:{settings.REDIS_PORT}"
-        self.pool = None
+        self.pool: Optional[aioredis.BlockingConnectionPool] = None
+        self.sync_pool = None
+        self._client: Optional[aioredis.Redis] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _pool_kwargs(self) -> dict:
+        return dict(
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+            decode_responses=True,
+        )
 
-    async def get_connection(self):
-        if self.pool is None:
-            self.pool = aioredis.ConnectionPool.from_url(
-                self.redis_url, max_connections=10, decode_responses=True
+    async def get_connection(self) -> aioredis.Redis:
+        """Shared client; callers must not close it"""
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is not loop:
+            # Connections are bound to the loop that opened them
+            self._client = None
+        if self._client is None:
+            self.pool = aioredis.BlockingConnectionPool.from_url(
+                self.redis_url, **self._pool_kwargs()
             )
-        return aioredis.Redis(connection_pool=self.pool)
+            self._client = aioredis.Redis(connection_pool=self.pool)
+            self._loop = loop
+        return self._client
+
+    def get_sync_connection(self) -> redis_sync.Redis:
+        """Client for synchronous code paths (CRUD, Celery tasks)"""
+        if self.sync_pool is None:
+            self.sync_pool = redis_sync.BlockingConnectionPool.from_url(
+                self.redis_url, **self._pool_kwargs()
+            )
+        return redis_sync.Redis(connection_pool=self.sync_pool)
 
     async def get(self, key: str) -> Optional[Any]:
         redis = await self.get_connection()
-        try:
-            return await redis.get(key)
-        finally:
-            await redis.close()
+        return await redis.get(key)
+
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """Raw value, for binary payloads such as encoded cache entries"""
+        redis = await self.get_connection()
+        return await redis.execute_command("GET", key, **{NEVER_DECODE: True})
 
     async def set(self, key: str, value: Any, expire: int = None):
         redis = await self.get_connection()
-        try:
-            await redis.set(key, value, ex=expire)
-        finally:
-            await redis.close()
+        await redis.set(key, value, ex=expire)
 
     async def delete(self, key: str):
         redis = await self.get_connection()
+        return await redis.delete(key)
+
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = False) -> AsyncIterator[Any]:
+        """
+        Batch commands into one round trip; queued commands are executed
+        when the block exits without an error
+        """
+        redis = await self.get_connection()
+        async with redis.pipeline(transaction=transaction) as pipe:
+            yield pipe
+            await pipe.execute()
+
+    async def ping(self) -> bool:
+        """Health check"""
         try:
-            await redis.delete(key)
-        finally:
-            await redis.close()
+            redis = await self.get_connection()
+            return bool(await redis.ping())
+        except RedisError:
+            return False
+
+    async def connect(self):
+        """Startup hook: open the pool and verify the server is reachable"""
+        if not await self.ping():
+            logger.warning("Redis at %s is not reachable", settings.REDIS_HOST)
+
+    async def close(self):
+        """Shutdown hook: release every pooled connection"""
+        client, self._client, self._loop = self._client, None, None
+        if client is not None:
+            await client.aclose()
+            await self.pool.disconnect()
+        if self.sync_pool is not None:
+            self.sync_pool.disconnect()
+
+    def pool_stats(self) -> dict:
+        pool = self.pool
+        if pool is None:
+            return {"in_use": 0, "idle": 0, "max": settings.REDIS_MAX_CONNECTIONS}
+        return {
+            "in_use": len(pool._in_use_connections),
+            "idle": len(pool._available_connections),
+            "max": pool.max_connections,
+        }
 
 
 redis_client = RedisClient()
+
+REDIS_POOL_CONNECTIONS.stats = redis_client.pool_stats
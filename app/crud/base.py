@@ -1,7 +1,26 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+from uuid import UUID
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import Select, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.cache_invalidation import entity_tag, invalidation_bus
 from app.db.base import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -9,6 +28,25 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(obj: Base) -> str:
+    """Opaque cursor pointing just past ``obj`` in (created_at, id) order"""
+    raw = json.dumps([obj.created_at.isoformat(), str(obj.id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         """
@@ -24,6 +62,43 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     ) -> List[ModelType]:
         return db.query(self.model).offset(skip).limit(limit).all()
 
+    def get_page(
+        self,
+        db: Session,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        filters: tuple = (),
+        options: tuple = (),
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Keyset page, newest first. Returns the items and the cursor for the
+        next page (None on the last page); cost is independent of depth.
+        """
+        stmt = self._page_statement(cursor, limit, filters, options)
+        return self._paginate(list(db.execute(stmt).scalars().all()), limit)
+
+    def _page_statement(
+        self, cursor: Optional[str], limit: int, filters: tuple, options: tuple
+    ) -> Select:
+        stmt = select(self.model).where(*filters).options(*options)
+        if cursor is not None:
+            created_at, id = decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(self.model.created_at, self.model.id) < (created_at, id)
+            )
+        # One extra row tells us whether another page exists
+        return stmt.order_by(self.model.created_at.desc(), self.model.id.desc()).limit(
+            limit + 1
+        )
+
+    def _paginate(
+        self, items: List[ModelType], limit: int
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        if len(items) > limit:
+            return items[:limit], encode_cursor(items[limit - 1])
+        return items, None
+
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)
@@ -32,6 +107,18 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.refresh(db_obj)
         return db_obj
 
+    def create_many(self, db: Session, rows: Sequence[Dict[str, Any]]) -> List[UUID]:
+        """
+        Insert many rows in one executemany round trip instead of an ORM flush
+        per object. Runs in the caller's transaction and bypasses the identity
+        map; ids are generated up front and returned, so rows in the same batch
+        can reference each other. Rows should all have the same keys.
+        """
+        rows = [{"id": uuid.uuid4(), **row} for row in rows]
+        if rows:
+            db.execute(insert(self.model), rows)
+        return [row["id"] for row in rows]
+
     def update(
         self,
         db: Session,
@@ -50,10 +137,86 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        invalidation_bus.invalidate_sync([self._tag(db_obj.id)])
         return db_obj
 
     def remove(self, db: Session, *, id: Any) -> ModelType:
         obj = db.query(self.model).get(id)
         db.delete(obj)
         db.commit()
+        invalidation_bus.invalidate_sync([self._tag(id)])
+        return obj
+
+    def _tag(self, id: Any) -> str:
+        """Cache tag of a row, invalidated whenever the row changes"""
+        return entity_tag(self.model.__tablename__, id)
+
+    # Async variants, for request handlers running on an AsyncSession
+
+    async def get_async(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        return await db.get(self.model, id)
+
+    async def get_multi_async(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[ModelType]:
+        result = await db.execute(select(self.model).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    async def get_page_async(
+        self,
+        db: AsyncSession,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        filters: tuple = (),
+        options: tuple = (),
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        stmt = self._page_statement(cursor, limit, filters, options)
+        result = await db.execute(stmt)
+        return self._paginate(list(result.scalars().all()), limit)
+
+    async def create_async(
+        self, db: AsyncSession, *, obj_in: CreateSchemaType
+    ) -> ModelType:
+        obj_in_data = jsonable_encoder(obj_in)
+        db_obj = self.model(**obj_in_data)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def create_many_async(
+        self, db: AsyncSession, rows: Sequence[Dict[str, Any]]
+    ) -> List[UUID]:
+        rows = [{"id": uuid.uuid4(), **row} for row in rows]
+        if rows:
+            await db.execute(insert(self.model), rows)
+        return [row["id"] for row in rows]
+
+    async def update_async(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        obj_data = jsonable_encoder(db_obj)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        for field in obj_data:
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        await invalidation_bus.invalidate([self._tag(db_obj.id)])
+        return db_obj
+
+    async def remove_async(self, db: AsyncSession, *, id: Any) -> ModelType:
+        obj = await db.get(self.model, id)
+        await db.delete(obj)
+        await db.commit()
+        await invalidation_bus.invalidate([self._tag(id)])
         return obj
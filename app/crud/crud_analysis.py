@@ -1,10 +1,35 @@
-from typing import Any, List, Optional
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer, joinedload, raiseload
 from app.crud.base import CRUDBase
 from app.models.analysis import Analysis, AnalysisStatus
 from app.schemas.analysis import AnalysisCreate, AnalysisUpdate
 
 
+def detail_load_options() -> tuple:
+    """
+    Everything AnalysisDetail renders, fetched in one round trip; any other
+    relationship access raises instead of silently issuing more queries
+    """
+    return (
+        joinedload(Analysis.seo_data),
+        joinedload(Analysis.performance_data),
+        joinedload(Analysis.security_data),
+        joinedload(Analysis.accessibility_data),
+        raiseload("*"),
+    )
+
+
+def summary_load_options() -> tuple:
+    """Listings only render summary columns"""
+    return (
+        defer(Analysis.analysis_settings),
+        defer(Analysis.error_details),
+        raiseload("*"),
+    )
+
+
 class CRUDAnalysis(CRUDBase[Analysis, AnalysisCreate, AnalysisUpdate]):
     def get_by_correlation_id(
         self, db: Session, *, correlation_id: str
@@ -13,17 +38,94 @@ class CRUDAnalysis(CRUDBase[Analysis, AnalysisCreate, AnalysisUpdate]):
             db.query(Analysis).filter(Analysis.correlation_id == correlation_id).first()
         )
 
+    def get_detail(
+        self, db: Session, *, id: Any, user_id: Any = None
+    ) -> Optional[Analysis]:
+        """Analysis with all result data, optionally scoped to its creator"""
+        query = db.query(Analysis).options(*detail_load_options())
+        query = query.filter(Analysis.id == id)
+        if user_id is not None:
+            query = query.filter(Analysis.created_by == user_id)
+        return query.first()
+
+    async def get_detail_async(
+        self, db: AsyncSession, *, id: Any, user_id: Any = None
+    ) -> Optional[Analysis]:
+        query = select(Analysis).options(*detail_load_options())
+        query = query.where(Analysis.id == id)
+        if user_id is not None:
+            query = query.where(Analysis.created_by == user_id)
+        result = await db.execute(query)
+        return result.unique().scalar_one_or_none()
+
     def get_by_website(
         self, db: Session, *, website_id: Any, skip: int = 0, limit: int = 100
     ) -> List[Analysis]:
         return (
             db.query(Analysis)
+            .options(*summary_load_options())
             .filter(Analysis.website_id == website_id)
             .offset(skip)
             .limit(limit)
             .all()
         )
 
+    def get_latest_by_content_hash(
+        self,
+        db: Session,
+        *,
+        content_hash: str,
+        analyzer_version: str,
+        https: bool,
+        exclude_id: Any = None
+    ) -> Optional[Analysis]:
+        """
+        Most recent completed analysis of identical content, fetched over the
+        same scheme (HTTPS findings depend on it)
+        """
+        served_over_https = Analysis.url.startswith("https://")
+        query = db.query(Analysis).filter(
+            Analysis.content_hash == content_hash,
+            Analysis.analyzer_version == analyzer_version,
+            Analysis.status == AnalysisStatus.COMPLETED,
+            served_over_https if https else ~served_over_https,
+        )
+        if exclude_id is not None:
+            query = query.filter(Analysis.id != exclude_id)
+        return query.order_by(Analysis.created_at.desc()).first()
+
+    def get_page_by_website(
+        self,
+        db: Session,
+        *,
+        website_id: Any,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Analysis], Optional[str]]:
+        return self.get_page(
+            db,
+            cursor=cursor,
+            limit=limit,
+            filters=(Analysis.website_id == website_id,),
+            options=summary_load_options(),
+        )
+
+    async def get_page_by_user_async(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: Any,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Analysis], Optional[str]]:
+        return await self.get_page_async(
+            db,
+            cursor=cursor,
+            limit=limit,
+            filters=(Analysis.created_by == user_id,),
+            options=summary_load_options(),
+        )
+
     def update_status(
         self,
         db: Session,
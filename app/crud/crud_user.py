@@ -1,6 +1,14 @@
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.security import get_password_hash, verify_password
+from app.core.principal_cache import principal_cache
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+)
 from app.crud.base import CRUDBase
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
@@ -13,21 +21,41 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         """Get user by email."""
         return db.query(User).filter(User.email == email).first()
 
-    def create(self, db: Session, *, obj_in: UserCreate) -> User:
-        """Create new user with hashed password."""
-        db_obj = User(
+    async def get_by_email_async(
+        self, db: AsyncSession, *, email: str
+    ) -> Optional[User]:
+        """Get user by email."""
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
+
+    @staticmethod
+    def _new_user(obj_in: UserCreate, password_hash: str) -> User:
+        return User(
             email=obj_in.email,
-            password_hash=get_password_hash(obj_in.password),
+            password_hash=password_hash,
             is_active=obj_in.is_active,
             is_superuser=obj_in.is_superuser,
             settings=obj_in.settings,
             subscription_tier=obj_in.subscription_tier or "free",
         )
+
+    def create(self, db: Session, *, obj_in: UserCreate) -> User:
+        """Create new user with hashed password."""
+        db_obj = self._new_user(obj_in, get_password_hash(obj_in.password))
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    async def create_async(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
+        """Create new user, hashing the password off the event loop."""
+        password_hash = await get_password_hash_async(obj_in.password)
+        db_obj = self._new_user(obj_in, password_hash)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
     def update(
         self, db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
     ) -> User:
@@ -43,7 +71,16 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             del update_data["password"]
             update_data["password_hash"] = hashed_password
 
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        user = super().update(db, db_obj=db_obj, obj_in=update_data)
+        # Cached principals must not outlive deactivation or a password change
+        principal_cache.invalidate(user.id)
+        return user
+
+    def remove(self, db: Session, *, id: Any) -> User:
+        """Delete user."""
+        user = super().remove(db, id=id)
+        principal_cache.invalidate(id)
+        return user
 
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         """Authenticate user by email and password."""
@@ -54,6 +91,17 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             return None
         return user
 
+    async def authenticate_async(
+        self, db: AsyncSession, *, email: str, password: str
+    ) -> Optional[User]:
+        """Authenticate user by email and password."""
+        user = await self.get_by_email_async(db, email=email)
+        if not user:
+            return None
+        if not await verify_password_async(password, user.password_hash):
+            return None
+        return user
+
     def is_active(self, user: User) -> bool:
         """Check if user is active."""
         return user.is_active
@@ -74,6 +122,22 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             .all()
         )
 
+    def get_page_by_subscription(
+        self,
+        db: Session,
+        *,
+        subscription_tier: str,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[User], Optional[str]]:
+        """Get a keyset page of users by subscription tier."""
+        return self.get_page(
+            db,
+            cursor=cursor,
+            limit=limit,
+            filters=(User.subscription_tier == subscription_tier,),
+        )
+
     def update_subscription(
         self, db: Session, *, user_id: UUID, new_subscription: str
     ) -> Optional[User]:
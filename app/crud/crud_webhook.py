@@ -0,0 +1,33 @@
+from app.crud.base import CRUDBase
+from app.models.webhook import AnalysisEvent, WebhookConfig, WebhookDelivery
+from app.schemas.webhook import (
+    AnalysisEventBase,
+    AnalysisEventCreate,
+    WebhookConfigCreate,
+    WebhookConfigUpdate,
+    WebhookDeliveryBase,
+    WebhookDeliveryCreate,
+)
+
+
+class CRUDWebhookConfig(
+    CRUDBase[WebhookConfig, WebhookConfigCreate, WebhookConfigUpdate]
+):
+    pass
+
+
+class CRUDAnalysisEvent(
+    CRUDBase[AnalysisEvent, AnalysisEventCreate, AnalysisEventBase]
+):
+    pass
+
+
+class CRUDWebhookDelivery(
+    CRUDBase[WebhookDelivery, WebhookDeliveryCreate, WebhookDeliveryBase]
+):
+    pass
+
+
+webhook_config = CRUDWebhookConfig(WebhookConfig)
+analysis_event = CRUDAnalysisEvent(AnalysisEvent)
+webhook_delivery = CRUDWebhookDelivery(WebhookDelivery)
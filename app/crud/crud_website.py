@@ -1,4 +1,4 @@
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
 from app.models.website import Website
@@ -20,5 +20,17 @@ class CRUDWebsite(CRUDBase[Website, WebsiteCreate, WebsiteUpdate]):
             .all()
         )
 
+    def get_page_by_user(
+        self,
+        db: Session,
+        *,
+        user_id: Any,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Website], Optional[str]]:
+        return self.get_page(
+            db, cursor=cursor, limit=limit, filters=(Website.user_id == user_id,)
+        )
+
 
 website = CRUDWebsite(Website)
@@ -0,0 +1,153 @@
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+# Tables range-partitioned by month on created_at. Deliveries come after
+# the events they reference, and are dropped first.
+PARTITIONED_TABLES = ("analysis_events", "webhook_deliveries")
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    month = value.month - 1 + months
+    return datetime(value.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def create_default_partition(conn: Connection, table: str) -> None:
+    """
+    Catch-all partition, so inserts keep working if maintenance falls behind
+    and no monthly partition exists yet
+    """
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {default_partition_name(table)} "
+            f"PARTITION OF {table} DEFAULT"
+        )
+    )
+
+
+def create_partitions(
+    conn: Connection, table: str, start: datetime, end: datetime
+) -> None:
+    """
+    Create the monthly partitions of table covering [start, end). Rows that
+    landed in the default partition meanwhile are moved to their month.
+    """
+    existing = set(list_partitions(conn, table))
+    has_default = default_partition_name(table) in existing
+    month = month_start(start)
+    while month < end:
+        if partition_name(table, month) not in existing:
+            _create_partition(conn, table, month, has_default)
+        month = add_months(month, 1)
+
+
+def _create_partition(
+    conn: Connection, table: str, month: datetime, has_default: bool
+) -> None:
+    name = partition_name(table, month)
+    upper = add_months(month, 1)
+    bounds = f"FROM ('{month:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+    default = default_partition_name(table)
+    in_range = f"created_at >= '{month:%Y-%m-%d}' AND created_at < '{upper:%Y-%m-%d}'"
+    stray_rows = (
+        has_default
+        and conn.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})")
+        ).scalar()
+    )
+    if not stray_rows:
+        conn.execute(
+            text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}")
+        )
+        return
+
+    # A new partition may not overlap rows held by the default one, so they
+    # are moved into a standalone table that is then attached
+    logger.warning("Moving rows of %s out of %s", name, default)
+    conn.execute(
+        text(
+            f"CREATE TABLE {name} "
+            f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default} WHERE {in_range} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        )
+    )
+    conn.execute(
+        text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}")
+    )
+
+
+def list_partitions(conn: Connection, table: str) -> List[str]:
+    return list(
+        conn.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :table"
+            ),
+            {"table": table},
+        ).scalars()
+    )
+
+
+def drop_partitions_before(conn: Connection, table: str, cutoff: datetime) -> List[str]:
+    """
+    Drop the monthly partitions of table holding only rows older than
+    cutoff. Dropping a partition is a catalog operation, regardless of how
+    many rows it holds.
+    """
+    pattern = re.compile(rf"^{table}_p(\d{{6}})$")
+    dropped = []
+    for name in sorted(list_partitions(conn, table)):
+        match = pattern.match(name)
+        if match is None:
+            continue
+        month = datetime.strptime(match.group(1), "%Y%m")
+        if add_months(month, 1) <= cutoff:
+            conn.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
+
+
+def maintain_partitions(
+    conn: Connection, now: datetime, premake_months: int, retention_days: int
+) -> List[str]:
+    """
+    Make sure partitions exist for the current month and the next
+    premake_months, and drop those past retention. Returns the dropped
+    partitions.
+
+    An event and its deliveries share a created_at, so they live in the
+    same month and expire together; deliveries are dropped first.
+    """
+    end = add_months(month_start(now), premake_months + 1)
+    cutoff = now - timedelta(days=retention_days)
+    dropped = []
+    for table in PARTITIONED_TABLES:
+        create_default_partition(conn, table)
+        create_partitions(conn, table, now, end)
+    for table in reversed(PARTITIONED_TABLES):
+        dropped.extend(drop_partitions_before(conn, table, cutoff))
+    return dropped
@@ -1,10 +1,38 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from prometheus_client import make_asgi_app
 from starlette.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
+from app.core.cache_invalidation import invalidation_bus
 from app.core.config import settings
+from app.core.http import http_client
+from app.core.metrics import metrics_registry
+from app.core.rate_limit import local_limiters
+from app.core.redis import redis_client
+from app.core.security import password_hasher
+from app.db.session import async_engine
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await redis_client.connect()
+    invalidation_bus.start()
+    for limiter in local_limiters:
+        limiter.start()
+    yield
+    for limiter in local_limiters:
+        await limiter.stop()
+    await invalidation_bus.stop()
+    await http_client.close()
+    await redis_client.close()
+    await async_engine.dispose()
+    password_hasher.shutdown()
+
 
 app = FastAPI(
-    title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    title=settings.PROJECT_NAME,
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -19,6 +47,9 @@ if settings.BACKEND_CORS_ORIGINS:
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# Prometheus scrape endpoint
+app.mount("/metrics", make_asgi_app(registry=metrics_registry()))
+
 
 @app.get("/health", tags=["public"])
 def health_check():
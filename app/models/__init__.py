@@ -9,6 +9,7 @@ from app.models.analysis_data import (
     AccessibilityData,
 )
 from app.models.webhook import WebhookConfig, WebhookDelivery, AnalysisEvent
+from app.models.blob import PageBlob
 
 # For Alembic auto-generation
 __all__ = [
@@ -24,4 +25,5 @@ __all__ = [
     "WebhookConfig",
     "WebhookDelivery",
     "AnalysisEvent",
+    "PageBlob",
 ]
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
-from sqlalchemy import String, JSON, ForeignKey, Float, Integer, Text, Enum
+from sqlalchemy import String, JSON, ForeignKey, Float, Integer, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 from app.db.base import Base
@@ -16,14 +16,24 @@ class AnalysisStatus(enum.Enum):
 
 class Analysis(Base):
     __tablename__ = "analysis"
+    __table_args__ = (
+        # Keyset pagination of per-website and per-user listings
+        Index("ix_analysis_website_id_created_at_id", "website_id", "created_at", "id"),
+        Index("ix_analysis_created_by_created_at_id", "created_by", "created_at", "id"),
+    )
 
     website_id: Mapped[UUID] = mapped_column(ForeignKey("website.id"), nullable=False)
     correlation_id: Mapped[str] = mapped_column(String, unique=True, nullable=False)
     url: Mapped[str] = mapped_column(String, nullable=False)
-    html_content: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    html_blob_key: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    html_size: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    content_hash: Mapped[Optional[str]] = mapped_column(
+        String(64), nullable=True, index=True
+    )
+    analyzer_version: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     analysis_settings: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
     status: Mapped[AnalysisStatus] = mapped_column(
-        Enum(AnalysisStatus), default=AnalysisStatus.PENDING
+        Enum(AnalysisStatus), default=AnalysisStatus.PENDING, index=True
     )
     current_stage: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     progress: Mapped[float] = mapped_column(Float, default=0.0)
@@ -45,9 +55,19 @@ class Analysis(Base):
     accessibility_data: Mapped["AccessibilityData"] = relationship(
         "AccessibilityData", back_populates="analysis", uselist=False
     )
-    recommendations: Mapped[List["Recommendation"]] = relationship(
-        "Recommendation", back_populates="analysis"
-    )
     events: Mapped[List["AnalysisEvent"]] = relationship(
         "AnalysisEvent", back_populates="analysis"
     )
+
+    @property
+    def html_content(self) -> Optional[str]:
+        """Page body, loaded from the blob store on first access"""
+        if self.html_blob_key is None:
+            return None
+        cached = self.__dict__.get("_html_content")
+        if cached is None or cached[0] != self.html_blob_key:
+            from app.core.blob_store import blob_store
+
+            cached = (self.html_blob_key, blob_store.get_text(self.html_blob_key))
+            self.__dict__["_html_content"] = cached
+        return cached[1]
@@ -6,7 +6,7 @@ from app.db.base import Base
 class SEOData(Base):
     __tablename__ = "seo_data"
 
-    analysis_id = Column(UUID, ForeignKey("analysis.id"), nullable=False)
+    analysis_id = Column(UUID, ForeignKey("analysis.id"), nullable=False, index=True)
     title_exists = Column(Boolean, default=False)
     title_length = Column(Integer)
     title_content = Column(String)
@@ -28,7 +28,7 @@ class SEOData(Base):
 class PerformanceData(Base):
     __tablename__ = "performance_data"
 
-    analysis_id = Column(UUID, ForeignKey("analysis.id"), nullable=False)
+    analysis_id = Column(UUID, ForeignKey("analysis.id"), nullable=False, index=True)
     page_load_time = Column(Float)
     largest_contentful_paint = Column(Float)
     cumulative_layout_shift = Column(Float)
@@ -46,7 +46,7 @@ class PerformanceData(Base):
 class SecurityData(Base):
     __tablename__ = "security_data"
 
-    analysis_id = Column(UUID, ForeignKey("analysis.id"), nullable=False)
+    analysis_id = Column(UUID, ForeignKey("analysis.id"), nullable=False, index=True)
     https_enabled = Column(Boolean)
     csp_enabled = Column(Boolean)
     csp_analysis = Column(JSON)
@@ -63,7 +63,7 @@ class SecurityData(Base):
 class AccessibilityData(Base):
     __tablename__ = "accessibility_data"
 
-    analysis_id = Column(UUID, ForeignKey("analysis.id"), nullable=False)
+    analysis_id = Column(UUID, ForeignKey("analysis.id"), nullable=False, index=True)
     alt_missing_count = Column(Integer)
     heading_structure_valid = Column(Boolean)
     contrast_ratio_avg = Column(Float)
@@ -0,0 +1,13 @@
+from sqlalchemy import String, BigInteger, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class PageBlob(Base):
+    """Maps a content-addressed blob key to its Postgres large object"""
+
+    __tablename__ = "page_blobs"
+
+    key: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    oid: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
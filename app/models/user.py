@@ -1,11 +1,19 @@
 from typing import List, Optional
-from sqlalchemy import String, JSON, Boolean
+from sqlalchemy import String, JSON, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 
 
 class User(Base):
     __tablename__ = "user"
+    __table_args__ = (
+        Index(
+            "ix_user_subscription_tier_created_at_id",
+            "subscription_tier",
+            "created_at",
+            "id",
+        ),
+    )
 
     email: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
     password_hash: Mapped[str] = mapped_column(String, nullable=False)
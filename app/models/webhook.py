@@ -1,7 +1,8 @@
 from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
-from sqlalchemy import String, JSON, ForeignKey, Boolean, Integer, DateTime
+from sqlalchemy import String, JSON, ForeignKey, Boolean, Integer, DateTime, Index, text
+from sqlalchemy import Uuid
 from sqlalchemy.types import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
@@ -9,6 +10,14 @@ from app.db.base import Base
 
 class WebhookConfig(Base):
     __tablename__ = "webhook_configs"
+    __table_args__ = (
+        # Only active configs are ever looked up when dispatching events
+        Index(
+            "ix_webhook_configs_active_website_id",
+            "website_id",
+            postgresql_where=text("is_active"),
+        ),
+    )
 
     website_id: Mapped[UUID] = mapped_column(ForeignKey("website.id"), nullable=False)
     url: Mapped[str] = mapped_column(String, nullable=False)
@@ -17,6 +26,9 @@ class WebhookConfig(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     retry_count: Mapped[int] = mapped_column(Integer, default=3)
     retry_strategy: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # Opt-in batching: coalesce events into one request per window (seconds)
+    batch_window: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    batch_max_size: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
     # Relationships
     website: Mapped["Website"] = relationship(
@@ -29,8 +41,16 @@ class WebhookConfig(Base):
 
 class AnalysisEvent(Base):
     __tablename__ = "analysis_events"
+    # Monthly range partitions, managed by app.db.partitions
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
-    analysis_id: Mapped[UUID] = mapped_column(ForeignKey("analysis.id"), nullable=False)
+    # The partition key must be part of the primary key
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, primary_key=True, default=datetime.utcnow
+    )
+    analysis_id: Mapped[UUID] = mapped_column(
+        ForeignKey("analysis.id"), nullable=False, index=True
+    )
     event_type: Mapped[str] = mapped_column(String, nullable=False)
     event_data: Mapped[dict] = mapped_column(JSON)
     triggered_by: Mapped[Optional[str]] = mapped_column(String, nullable=True)
@@ -38,19 +58,35 @@ class AnalysisEvent(Base):
     # Relationships
     analysis: Mapped["Analysis"] = relationship("Analysis", back_populates="events")
     webhook_deliveries: Mapped[List["WebhookDelivery"]] = relationship(
-        "WebhookDelivery", back_populates="analysis_event"
+        "WebhookDelivery",
+        primaryjoin="AnalysisEvent.id == foreign(WebhookDelivery.analysis_event_id)",
+        back_populates="analysis_event",
     )
 
 
 class WebhookDelivery(Base):
     __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        # Pending deliveries due for (re)try, in due order
+        Index(
+            "ix_webhook_deliveries_pending_next_retry_at",
+            "next_retry_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        # Monthly range partitions, managed by app.db.partitions
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    webhook_config_id: Mapped[UUID] = mapped_column(
-        ForeignKey("webhook_configs.id"), nullable=False
+    # The partition key must be part of the primary key
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, primary_key=True, default=datetime.utcnow
     )
-    analysis_event_id: Mapped[UUID] = mapped_column(
-        ForeignKey("analysis_events.id"), nullable=False
+    webhook_config_id: Mapped[UUID] = mapped_column(
+        ForeignKey("webhook_configs.id"), nullable=False, index=True
     )
+    # No foreign key: analysis_events is partitioned, so its id alone is not
+    # unique in the database
+    analysis_event_id: Mapped[UUID] = mapped_column(Uuid, nullable=False, index=True)
     attempt_count: Mapped[int] = mapped_column(Integer, default=0)
     status: Mapped[str] = mapped_column(String)
     request_details: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
@@ -62,5 +98,7 @@ class WebhookDelivery(Base):
         "WebhookConfig", back_populates="deliveries"
     )
     analysis_event: Mapped["AnalysisEvent"] = relationship(
-        "AnalysisEvent", back_populates="webhook_deliveries"
+        "AnalysisEvent",
+        primaryjoin="foreign(WebhookDelivery.analysis_event_id) == AnalysisEvent.id",
+        back_populates="webhook_deliveries",
     )
@@ -1,12 +1,15 @@
 from typing import List, Optional
 from uuid import UUID
-from sqlalchemy import String, JSON, ForeignKey
+from sqlalchemy import String, JSON, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 
 
 class Website(Base):
     __tablename__ = "website"
+    __table_args__ = (
+        Index("ix_website_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     name: Mapped[str] = mapped_column(String, nullable=False)
     domain: Mapped[str] = mapped_column(String, unique=True, nullable=False)
@@ -33,7 +33,9 @@ class AnalysisInDBBase(AnalysisBase, IDSchema):
     website_id: UUID
     created_by: UUID
     correlation_id: str
-    html_content: Optional[str] = None
+    html_size: Optional[int] = None
+    content_hash: Optional[str] = None
+    analyzer_version: Optional[str] = None
 
 
 class Analysis(AnalysisInDBBase):
@@ -130,6 +132,14 @@ class AccessibilityData(AccessibilityDataBase, IDSchema):
 
 
 # Response Schemas
+class AnalysisSummary(IDSchema):
+    website_id: UUID
+    url: str
+    status: AnalysisStatus
+    current_stage: Optional[str] = None
+    progress: float = 0.0
+
+
 class AnalysisResponse(BaseModel):
     id: UUID
     task_id: str
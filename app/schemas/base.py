@@ -1,7 +1,10 @@
 from datetime import datetime
+from typing import Generic, List, Optional, TypeVar
 from uuid import UUID
 from pydantic import BaseModel, ConfigDict
 
+ItemType = TypeVar("ItemType")
+
 
 class BaseSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -14,3 +17,8 @@ class TimestampedSchema(BaseSchema):
 
 class IDSchema(TimestampedSchema):
     id: UUID
+
+
+class Page(BaseModel, Generic[ItemType]):
+    items: List[ItemType]
+    next_cursor: Optional[str] = None
@@ -1,6 +1,7 @@
 from typing import Optional, Dict
+from uuid import UUID
 from pydantic import BaseModel, EmailStr
-from app.schemas.base import IDSchema
+from app.schemas.base import BaseSchema, IDSchema
 
 
 class UserBase(BaseModel):
@@ -29,3 +30,13 @@ class User(UserInDBBase):
 
 class UserInDB(UserInDBBase):
     password_hash: str
+
+
+class UserPrincipal(BaseSchema):
+    """Authenticated identity; small enough to cache per request"""
+
+    id: UUID
+    email: str
+    is_active: bool
+    is_superuser: bool
+    subscription_tier: str
@@ -1,7 +1,7 @@
 from typing import Optional, Dict, List
 from uuid import UUID
 from datetime import datetime
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl
 from app.schemas.base import IDSchema
 
 
@@ -12,6 +12,8 @@ class WebhookConfigBase(BaseModel):
     is_active: bool = True
     retry_count: int = 3
     retry_strategy: Optional[Dict] = None
+    batch_window: Optional[int] = Field(default=None, gt=0)
+    batch_max_size: Optional[int] = Field(default=None, gt=0)
 
 
 class WebhookConfigCreate(WebhookConfigBase):
@@ -25,6 +27,8 @@ class WebhookConfigUpdate(BaseModel):
     is_active: Optional[bool] = None
     retry_count: Optional[int] = None
     retry_strategy: Optional[Dict] = None
+    batch_window: Optional[int] = Field(default=None, gt=0)
+    batch_max_size: Optional[int] = Field(default=None, gt=0)
 
 
 class WebhookConfig(WebhookConfigBase, IDSchema):
@@ -1,53 +1,333 @@
 import asyncio
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Optional
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.models.analysis import Analysis
-from app.services.webhook_service import send_webhook_notification
-from app.core.redis import RedisClient
+from app.crud.crud_analysis import analysis as analysis_crud
+from app.models.analysis import Analysis, AnalysisStatus
+from app.models.analysis_data import (
+    SEOData,
+    PerformanceData,
+    SecurityData,
+    AccessibilityData,
+)
+from app.schemas.analysis import AnalysisDetail
+from app.services.content_hash import compute_content_hash
+from app.services.page_facts import PageFacts, extract_page_facts
+from app.services.webhook_service import notify_dispatcher, record_event
+from app.core.cache_codec import CacheCodec
+from app.core.cache_invalidation import entity_tag, invalidation_bus
+from app.core.config import settings
+from app.core.local_cache import LocalCache
+from app.core.read_through_cache import ReadThroughCache
+from app.core.redis import redis_client
+from app.db.session import AsyncSessionLocal
+
+# Bump whenever analyzer output changes; results are only reused between
+# analyses of identical content produced by the same analyzer version
+ANALYZER_VERSION = "1"
+
+# Bump whenever the AnalysisDetail schema changes, so stale cache entries
+# are treated as misses instead of being served
+ANALYSIS_CACHE_SCHEMA_VERSION = 1
+ANALYSIS_CACHE_TTL = 3600
+
+analysis_cache_codec = CacheCodec(
+    AnalysisDetail, schema_version=ANALYSIS_CACHE_SCHEMA_VERSION
+)
+analysis_cache = ReadThroughCache(
+    redis_client,
+    ttl=ANALYSIS_CACHE_TTL,
+    local=LocalCache(settings.CACHE_L1_MAX_BYTES, settings.CACHE_L1_TTL),
+    bus=invalidation_bus,
+)
+
+
+def analysis_cache_key(analysis_id: Any, user_id: Any) -> str:
+    """Entries are per owner, so a cache hit never bypasses the access check"""
+    return f"analysis:{user_id}:{analysis_id}"
+
+
+@dataclass(frozen=True)
+class AnalysisPayload:
+    """Serialized AnalysisDetail with the validators needed for HTTP caching"""
+
+    content: bytes
+    etag: str
+    finished: bool  # completed or failed, so the content will not change
+
+
+def decode_analysis_payload(payload: bytes) -> Optional[AnalysisPayload]:
+    content = analysis_cache_codec.to_json(payload)
+    if content is None:
+        return None
+    status = orjson.loads(content)["status"]
+    return AnalysisPayload(
+        content=content,
+        etag=f'"{hashlib.sha256(content).hexdigest()[:32]}"',
+        finished=status
+        in (AnalysisStatus.COMPLETED.value, AnalysisStatus.FAILED.value),
+    )
+
+
+ANALYSIS_DATA_RELATIONSHIPS = (
+    "seo_data",
+    "performance_data",
+    "security_data",
+    "accessibility_data",
+)
+
+
+def is_https(url: str) -> bool:
+    return url.startswith("https://")
+
+
+def canonical_matches(canonical_url: Optional[str], url: str) -> Optional[bool]:
+    if not canonical_url:
+        return None
+    return canonical_url.rstrip("/") == url.rstrip("/")
+
+
+def clone_analysis_data(row, analysis: Analysis, page_size: int):
+    """
+    Copy an analysis data row onto another analysis of identical content.
+    Fields derived from the URL or the raw body rather than the normalized
+    content are recomputed for the target, or left out when that would take
+    another parse; results are only reused between pages with the same
+    scheme, so the HTTPS findings carry over as is.
+    """
+    skip = {"id", "created_at", "updated_at", "analysis_id"}
+    values = {
+        column.key: getattr(row, column.key)
+        for column in row.__table__.columns
+        if column.key not in skip
+    }
+    clone = type(row)(analysis_id=analysis.id, **values)
+    if isinstance(clone, SEOData):
+        clone.canonical_correct = canonical_matches(clone.canonical_url, analysis.url)
+    elif isinstance(clone, PerformanceData):
+        clone.total_page_size = float(page_size)
+        # Inline script sizes include whitespace, which the hash ignores
+        clone.resource_timing = {
+            name: value
+            for name, value in (clone.resource_timing or {}).items()
+            if name != "inline_script_bytes"
+        }
+    return clone
 
 
 class AnalyzerService:
+    async def reuse_previous_results(self, analysis_id: str, db: Session) -> bool:
+        """
+        Clone the results of a previous analysis of identical content.
+        Returns False when there is nothing to reuse.
+        """
+        analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+        if analysis.content_hash is None:
+            if analysis.html_content is None:
+                return False
+            analysis.content_hash = compute_content_hash(analysis.html_content)
+
+        previous = analysis_crud.get_latest_by_content_hash(
+            db,
+            content_hash=analysis.content_hash,
+            analyzer_version=ANALYZER_VERSION,
+            https=is_https(analysis.url),
+            exclude_id=analysis.id,
+        )
+        if previous is None:
+            return False
+
+        # The hash ignores formatting, so the raw size can differ
+        page_size = len((analysis.html_content or "").encode("utf-8"))
+        for relationship in ANALYSIS_DATA_RELATIONSHIPS:
+            row = getattr(previous, relationship)
+            if row is not None:
+                db.add(clone_analysis_data(row, analysis, page_size))
+        self._mark_completed(analysis, db)
+        db.commit()
+
+        await self._publish_results(analysis_id, db)
+        return True
+
     async def run_parallel_analysis(self, analysis_id: str, db: Session):
         """Run all analysis tasks in parallel"""
+        analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+
+        # Walk the page once; every analyzer reads from the shared facts
+        facts = extract_page_facts(analysis.html_content or "", url=analysis.url)
+
         analysis_tasks = [
-            self.run_seo_analysis(analysis_id, db),
-            self.run_performance_check(analysis_id, db),
-            self.run_security_scan(analysis_id, db),
-            self.run_accessibility_test(analysis_id, db),
-            self.run_ux_evaluation(analysis_id, db),
-            self.run_market_analysis(analysis_id, db),
+            self.run_seo_analysis(analysis, facts, db),
+            self.run_performance_check(analysis, facts, db),
+            self.run_security_scan(analysis, facts, db),
+            self.run_accessibility_test(analysis, facts, db),
         ]
 
         await asyncio.gather(*analysis_tasks)
+        self._mark_completed(analysis, db)
+        db.commit()
+
+        await self._publish_results(analysis_id, db)
+
+    def _mark_completed(self, analysis: Analysis, db: Session):
+        analysis.analyzer_version = ANALYZER_VERSION
+        analysis.status = AnalysisStatus.COMPLETED
+        analysis.progress = 1.0
+        # Committed together with the status change
+        record_event(db, analysis.id, "analysis_complete", {"status": "completed"})
 
+    async def _publish_results(self, analysis_id: str, db: Session):
         # Save to cache
         await self.cache_analysis_results(analysis_id, db)
 
-        # Send webhook notification
-        await send_webhook_notification(
-            analysis_id=analysis_id,
-            event_type="analysis_complete",
-            data={"status": "completed"},
-        )
+        # Wake the webhook dispatcher
+        notify_dispatcher()
 
-    async def run_seo_analysis(self, analysis_id: str, db: Session):
+    async def run_seo_analysis(self, analysis: Analysis, facts: PageFacts, db: Session):
         """Run SEO analysis"""
-        analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
-        # Implement SEO analysis logic
-        pass
+        headings = {}
+        for level, text in facts.headings:
+            headings.setdefault(f"h{level}", []).append(text)
+
+        canonical_url = facts.canonical_url
+        db.add(
+            SEOData(
+                analysis_id=analysis.id,
+                title_exists=bool(facts.title),
+                title_length=len(facts.title or ""),
+                title_content=facts.title,
+                description_exists=bool(facts.description),
+                description_length=len(facts.description or ""),
+                description_content=facts.description,
+                canonical_url=canonical_url,
+                canonical_correct=canonical_matches(canonical_url, analysis.url),
+                meta_tags={
+                    tag.get("name"): tag.get("content")
+                    for tag in facts.meta_tags
+                    if tag.get("name")
+                },
+                open_graph_data=facts.open_graph,
+                structured_data={"items": facts.structured_data},
+                word_count=facts.word_count,
+                h_tags_structure=headings,
+            )
+        )
 
-    async def run_performance_check(self, analysis_id: str, db: Session):
+    async def run_performance_check(
+        self, analysis: Analysis, facts: PageFacts, db: Session
+    ):
         """Run performance analysis"""
-        # Implement performance analysis logic
-        pass
+        db.add(
+            PerformanceData(
+                analysis_id=analysis.id,
+                resource_count=len(facts.scripts)
+                + len(facts.stylesheets)
+                + len(facts.images),
+                total_page_size=float(facts.html_size),
+                resource_timing={
+                    "blocking_scripts": sum(
+                        1
+                        for script in facts.scripts
+                        if script["src"] and not (script["async"] or script["defer"])
+                    ),
+                    "inline_script_bytes": sum(
+                        script["inline_size"] for script in facts.scripts
+                    ),
+                },
+            )
+        )
 
-    # ... Similar methods for other analysis types ...
+    async def run_security_scan(
+        self, analysis: Analysis, facts: PageFacts, db: Session
+    ):
+        """Run security analysis"""
+        https_enabled = is_https(analysis.url)
+        resources = [script["src"] for script in facts.scripts] + facts.stylesheets
+        resources += [image["src"] for image in facts.images]
+        db.add(
+            SecurityData(
+                analysis_id=analysis.id,
+                https_enabled=https_enabled,
+                csp_enabled=facts.meta_content("content-security-policy") is not None,
+                vulnerability_scan={
+                    "mixed_content": [
+                        src
+                        for src in resources
+                        if https_enabled and src and src.startswith("http://")
+                    ],
+                    "insecure_form_actions": [
+                        form["action"]
+                        for form in facts.forms
+                        if form["action"] and form["action"].startswith("http://")
+                    ],
+                },
+            )
+        )
+
+    async def run_accessibility_test(
+        self, analysis: Analysis, facts: PageFacts, db: Session
+    ):
+        """Run accessibility analysis"""
+        levels = [level for level, _ in facts.headings]
+        heading_structure_valid = bool(levels) and levels[0] == 1
+        for previous, current in zip(levels, levels[1:]):
+            if current > previous + 1:
+                heading_structure_valid = False
+
+        db.add(
+            AccessibilityData(
+                analysis_id=analysis.id,
+                alt_missing_count=facts.images_missing_alt,
+                heading_structure_valid=heading_structure_valid,
+                skip_links_present=any(
+                    (anchor["href"] or "").startswith("#")
+                    and "skip" in anchor["text"].lower()
+                    for anchor in facts.anchors
+                ),
+                form_labels_missing=facts.unlabelled_fields,
+            )
+        )
+
+    async def get_complete_analysis(
+        self, db: AsyncSession, analysis_id: str, user_id: Any
+    ) -> Optional[AnalysisDetail]:
+        """Load an analysis with all of its results for the detail endpoint"""
+        analysis = await analysis_crud.get_detail_async(
+            db, id=analysis_id, user_id=user_id
+        )
+        if analysis is None:
+            return None
+        return AnalysisDetail.model_validate(analysis)
+
+    async def get_complete_analysis_payload(
+        self, analysis_id: str, user_id: Any
+    ) -> Optional[AnalysisPayload]:
+        """Detail payload as JSON, served through the read-through cache"""
+
+        async def load() -> Optional[bytes]:
+            async with AsyncSessionLocal() as db:
+                detail = await self.get_complete_analysis(db, analysis_id, user_id)
+            return analysis_cache_codec.encode(detail) if detail else None
+
+        return await analysis_cache.get_or_load(
+            analysis_cache_key(analysis_id, user_id),
+            load,
+            decode=decode_analysis_payload,
+            tags=[entity_tag("analysis", analysis_id)],
+        )
 
     async def cache_analysis_results(self, analysis_id: str, db: Session):
         """Cache analysis results in Redis"""
-        redis = RedisClient()
-        analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+        analysis = analysis_crud.get_detail(db, id=analysis_id)
 
-        await redis.set(f"analysis:{analysis_id}", analysis.to_dict(), expire=3600)
+        await analysis_cache.set(
+            analysis_cache_key(analysis_id, analysis.created_by),
+            analysis_cache_codec.encode(AnalysisDetail.model_validate(analysis)),
+            tags=[entity_tag("analysis", analysis_id)],
+        )
 
 
 analyzer_service = AnalyzerService()
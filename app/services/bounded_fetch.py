@@ -0,0 +1,129 @@
+import zlib
+from typing import AsyncIterator, Optional
+import aiohttp
+from app.core.config import settings
+from app.core.metrics import FETCH_LIMIT_TRIPS
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Capping brotli output needs output_buffer_limit (brotli >= 1.2); without
+# it "br" is not advertised, so one chunk cannot expand without bound
+if brotli is not None and not hasattr(brotli.Decompressor, "can_accept_more_data"):
+    brotli = None
+
+
+class FetchLimitExceeded(Exception):
+    """Raised when a fetched page trips one of the configured fetch limits"""
+
+    def __init__(self, limit: str, detail: str):
+        super().__init__(detail)
+        self.limit = limit
+        self.detail = detail
+        FETCH_LIMIT_TRIPS.labels(limit=limit).inc()
+
+
+def accept_encoding() -> str:
+    """Content codings we are able to decode within the byte budget"""
+    return "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+
+def check_content_type(response: aiohttp.ClientResponse) -> None:
+    """Reject responses whose media type is not in the allowlist"""
+    content_type = response.content_type or ""
+    if content_type not in settings.FETCH_ALLOWED_CONTENT_TYPES:
+        raise FetchLimitExceeded(
+            "content_type", f"Unsupported content type: {content_type!r}"
+        )
+
+
+class BoundedDecoder:
+    """Decode a content-encoded body while capping its decompressed size"""
+
+    def __init__(self, encoding: str, max_size: int):
+        self.remaining = max_size
+        encoding = encoding.strip().lower()
+        if encoding in ("gzip", "x-gzip", "deflate"):
+            # wbits | 32 auto-detects gzip and zlib headers
+            self._zlib = zlib.decompressobj(zlib.MAX_WBITS | 32)
+            self._raw_deflate = encoding == "deflate"
+            self._brotli = None
+        elif encoding == "br" and brotli is not None:
+            self._zlib = None
+            self._brotli = brotli.Decompressor()
+        elif encoding in ("", "identity"):
+            self._zlib = None
+            self._brotli = None
+        else:
+            raise FetchLimitExceeded(
+                "content_encoding", f"Unsupported content encoding: {encoding!r}"
+            )
+
+    def decode(self, data: bytes) -> bytes:
+        if self._zlib is not None:
+            try:
+                out = self._zlib.decompress(data, self.remaining + 1)
+            except zlib.error:
+                if not self._raw_deflate:
+                    raise
+                # Some servers send raw deflate streams without a zlib header
+                self._zlib = zlib.decompressobj(-zlib.MAX_WBITS)
+                self._raw_deflate = False
+                out = self._zlib.decompress(data, self.remaining + 1)
+            self._raw_deflate = False
+            if self._zlib.unconsumed_tail:
+                self._trip()
+        elif self._brotli is not None:
+            limit = self.remaining + 1
+            out = self._brotli.process(data, output_buffer_limit=limit)
+            # Drain buffered output, stopping as soon as the budget is exceeded
+            while len(out) < limit and not self._brotli.can_accept_more_data():
+                out += self._brotli.process(b"", output_buffer_limit=limit - len(out))
+        else:
+            out = data
+
+        if len(out) > self.remaining:
+            self._trip()
+        self.remaining -= len(out)
+        return out
+
+    def _trip(self):
+        raise FetchLimitExceeded(
+            "decompressed_size",
+            f"Decompressed body exceeds {settings.FETCH_MAX_DECOMPRESSED_BYTES} bytes",
+        )
+
+
+async def iter_bounded_body(
+    response: aiohttp.ClientResponse, chunk_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    Yield the decoded response body chunk by chunk, enforcing the wire and
+    decompressed byte budgets. Bodies over the wire budget are read up to
+    the budget before the limit trips, whatever their Content-Length says.
+    The response must be requested with ``auto_decompress=False``.
+    """
+    max_body = settings.FETCH_MAX_BODY_BYTES
+
+    decoder = BoundedDecoder(
+        response.headers.get("Content-Encoding", ""),
+        settings.FETCH_MAX_DECOMPRESSED_BYTES,
+    )
+    received = 0
+    async for chunk in response.content.iter_chunked(
+        chunk_size or settings.HTML_PARSER_CHUNK_SIZE
+    ):
+        received += len(chunk)
+        over = received - max_body
+        if over > 0:
+            # Keep the part of the chunk that still fits the budget
+            chunk = chunk[: len(chunk) - over]
+        decoded = decoder.decode(chunk)
+        if decoded:
+            yield decoded
+        if over > 0:
+            raise FetchLimitExceeded(
+                "body_size", f"Response body exceeds {max_body} bytes"
+            )
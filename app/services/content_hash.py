@@ -0,0 +1,19 @@
+import hashlib
+import re
+
+COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_html(html_content: str) -> str:
+    """
+    Drop comments and collapse whitespace, so pages that differ only in
+    formatting or generator comments hash the same
+    """
+    html_content = COMMENT_RE.sub("", html_content)
+    return WHITESPACE_RE.sub(" ", html_content).strip()
+
+
+def compute_content_hash(html_content: str) -> str:
+    """SHA-256 of the normalized page body"""
+    return hashlib.sha256(normalize_html(html_content).encode("utf-8")).hexdigest()
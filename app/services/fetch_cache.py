@@ -0,0 +1,75 @@
+import asyncio
+import hashlib
+import json
+from typing import Dict, Mapping, Optional
+from app.core.blob_store import BlobStore, blob_store
+from app.core.config import settings
+from app.core.redis import RedisClient, redis_client
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class FetchCache:
+    """
+    Per-URL validators (ETag / Last-Modified) plus the last body and parsed
+    metadata, so repeat fetches can be revalidated with a conditional GET.
+    Bodies live in the content-addressed blob store, shared with analyses.
+    """
+
+    def __init__(
+        self, redis: RedisClient, blobs: BlobStore, prefix: str = "fetch_cache"
+    ):
+        self.redis = redis
+        self.blobs = blobs
+        self.prefix = prefix
+
+    async def get(self, url: str) -> Optional[dict]:
+        """Cached validators and metadata for a URL"""
+        raw = await self.redis.get(f"{self.prefix}:url:{url_key(url)}")
+        return json.loads(raw) if raw else None
+
+    async def get_body(self, entry: dict) -> Optional[str]:
+        """Cached body for an entry, None if it has been evicted"""
+        return await asyncio.to_thread(self.blobs.get_text, entry["body_hash"])
+
+    def conditional_headers(self, entry: Optional[dict]) -> Dict[str, str]:
+        """Request headers revalidating a cached entry"""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    async def store(
+        self,
+        url: str,
+        response_headers: Mapping[str, str],
+        html_content: str,
+        metadata: dict,
+    ) -> None:
+        """Remember a fully fetched page if the server sent validators"""
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        digest = await asyncio.to_thread(self.blobs.put_text, html_content)
+        entry = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "body_hash": digest,
+            "metadata": metadata,
+        }
+        await self.redis.set(
+            f"{self.prefix}:url:{url_key(url)}",
+            json.dumps(entry),
+            expire=settings.FETCH_CACHE_TTL,
+        )
+
+
+fetch_cache = FetchCache(redis_client, blob_store)
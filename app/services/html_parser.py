@@ -0,0 +1,91 @@
+from typing import Any, Dict, List, Optional
+from lxml import etree
+
+# Attributes BeautifulSoup splits into lists, kept identical so both parser
+# modes produce the same metadata dict
+MULTI_VALUED_ATTRIBUTES = {"class", "rel", "rev"}
+
+
+def element_attrs(element) -> Dict[str, Any]:
+    """Return element attributes in the shape BeautifulSoup exposes them"""
+    attrs = {}
+    for name, value in element.attrib.items():
+        if name in MULTI_VALUED_ATTRIBUTES:
+            attrs[name] = value.split()
+        else:
+            attrs[name] = value
+    return attrs
+
+
+class StreamingMetadataParser:
+    """
+    Incremental HTML metadata extractor built on lxml's feed parser.
+
+    Chunks are fed as they arrive from the network; elements are discarded
+    as soon as they are closed, so memory stays flat regardless of page size.
+    """
+
+    def __init__(self, encoding: Optional[str] = None):
+        try:
+            self._parser = self._pull_parser(encoding)
+        except LookupError:
+            # Charset unknown to libxml2; decode like the stored body does
+            self._parser = self._pull_parser("utf-8")
+        self.title: Optional[str] = None
+        self.meta_tags: List[Dict[str, Any]] = []
+        self.links: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def _pull_parser(encoding: Optional[str]) -> etree.HTMLPullParser:
+        return etree.HTMLPullParser(
+            events=("start", "end"),
+            encoding=encoding,
+            remove_comments=True,
+            remove_pis=True,
+        )
+
+    def feed(self, chunk: bytes) -> None:
+        """Feed the next chunk of the response body"""
+        self._parser.feed(chunk)
+        self._drain_events()
+
+    def close(self) -> Dict[str, Any]:
+        """Flush the parser and return the collected metadata"""
+        try:
+            self._parser.close()
+        except etree.XMLSyntaxError:
+            # Empty or hopelessly broken documents still yield what was seen
+            pass
+        self._drain_events()
+        return self.metadata
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "title": self.title,
+            "meta_tags": self.meta_tags,
+            "links": self.links,
+        }
+
+    def _drain_events(self) -> None:
+        for event, element in self._parser.read_events():
+            tag = element.tag
+            if not isinstance(tag, str):
+                continue
+
+            if event == "start":
+                if tag == "meta":
+                    self.meta_tags.append(element_attrs(element))
+                elif tag == "link":
+                    self.links.append(element_attrs(element))
+                continue
+
+            if tag == "title" and self.title is None:
+                self.title = element.text
+
+            # Drop the finished subtree and any already processed siblings
+            element.clear(keep_tail=True)
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
@@ -0,0 +1,188 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import lxml.html
+from lxml import etree
+from app.services.html_parser import element_attrs
+
+HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+NON_CONTENT_TAGS = {"script", "style", "template"}
+FORM_FIELD_TAGS = {"input", "select", "textarea"}
+UNLABELLED_INPUT_TYPES = {"hidden", "submit", "button", "image", "reset"}
+
+
+@dataclass
+class PageFacts:
+    """Everything the analyzers need from a page, collected in one DOM walk"""
+
+    url: str
+    html_size: int = 0
+    title: Optional[str] = None
+    lang: Optional[str] = None
+    meta_tags: List[Dict[str, Any]] = field(default_factory=list)
+    links: List[Dict[str, Any]] = field(default_factory=list)
+    headings: List[Tuple[int, str]] = field(default_factory=list)
+    images: List[Dict[str, Optional[str]]] = field(default_factory=list)
+    forms: List[Dict[str, Optional[str]]] = field(default_factory=list)
+    form_fields: List[Dict[str, Any]] = field(default_factory=list)
+    anchors: List[Dict[str, Optional[str]]] = field(default_factory=list)
+    scripts: List[Dict[str, Any]] = field(default_factory=list)
+    stylesheets: List[str] = field(default_factory=list)
+    structured_data: List[Any] = field(default_factory=list)
+    word_count: int = 0
+
+    def meta_content(self, name: str) -> Optional[str]:
+        """Content of the first <meta name=...> or <meta property=...> tag"""
+        name = name.lower()
+        for tag in self.meta_tags:
+            key = tag.get("name") or tag.get("property") or tag.get("http-equiv")
+            if key and key.lower() == name:
+                return tag.get("content")
+        return None
+
+    @property
+    def description(self) -> Optional[str]:
+        return self.meta_content("description")
+
+    @property
+    def canonical_url(self) -> Optional[str]:
+        for link in self.links:
+            if "canonical" in link.get("rel", []):
+                return link.get("href")
+        return None
+
+    @property
+    def open_graph(self) -> Dict[str, str]:
+        return {
+            tag["property"]: tag.get("content")
+            for tag in self.meta_tags
+            if tag.get("property", "").startswith("og:")
+        }
+
+    @property
+    def images_missing_alt(self) -> int:
+        return sum(1 for image in self.images if image["alt"] is None)
+
+    @property
+    def unlabelled_fields(self) -> int:
+        return sum(1 for form_field in self.form_fields if not form_field["labelled"])
+
+
+def extract_page_facts(html_content: str, url: str) -> PageFacts:
+    """Walk the document once and collect the facts shared by all analyzers"""
+    body = html_content.encode("utf-8")
+    facts = PageFacts(url=url, html_size=len(body))
+    if not html_content.strip():
+        return facts
+
+    # Parse the bytes: lxml rejects str input that carries an XML encoding
+    # declaration (common in XHTML). The text is already decoded, so any
+    # declared encoding is overridden.
+    try:
+        root = lxml.html.document_fromstring(
+            body, parser=lxml.html.HTMLParser(encoding="utf-8")
+        )
+    except etree.ParserError:
+        # Nothing but whitespace or comments
+        return facts
+
+    facts.lang = root.get("lang")
+    labelled_ids = set()
+    text_sinks: Dict[Any, List[str]] = {}
+    skip_depth = 0
+    label_depth = 0
+
+    def add_text(text: Optional[str]) -> None:
+        if not text or skip_depth:
+            return
+        facts.word_count += len(text.split())
+        for parts in text_sinks.values():
+            parts.append(text)
+
+    for event, element in etree.iterwalk(root, events=("start", "end")):
+        tag = element.tag if isinstance(element.tag, str) else None
+
+        if event == "start":
+            if tag in NON_CONTENT_TAGS:
+                skip_depth += 1
+
+            if tag in HEADING_TAGS or tag in ("title", "a"):
+                text_sinks[element] = []
+            elif tag == "label":
+                label_depth += 1
+                if element.get("for"):
+                    labelled_ids.add(element.get("for"))
+            elif tag == "meta":
+                facts.meta_tags.append(element_attrs(element))
+            elif tag == "link":
+                attrs = element_attrs(element)
+                facts.links.append(attrs)
+                if "stylesheet" in attrs.get("rel", []) and attrs.get("href"):
+                    facts.stylesheets.append(attrs["href"])
+            elif tag == "img":
+                facts.images.append(
+                    {"src": element.get("src"), "alt": element.get("alt")}
+                )
+            elif tag == "form":
+                facts.forms.append(
+                    {"action": element.get("action"), "method": element.get("method")}
+                )
+            elif tag in FORM_FIELD_TAGS:
+                field_type = (element.get("type") or "text").lower()
+                if field_type not in UNLABELLED_INPUT_TYPES:
+                    facts.form_fields.append(
+                        {
+                            "tag": tag,
+                            "type": field_type,
+                            "id": element.get("id"),
+                            "labelled": bool(
+                                label_depth
+                                or element.get("aria-label")
+                                or element.get("aria-labelledby")
+                                or element.get("title")
+                            ),
+                        }
+                    )
+            elif tag == "script":
+                script_type = (element.get("type") or "").lower()
+                if script_type == "application/ld+json":
+                    try:
+                        facts.structured_data.append(json.loads(element.text or ""))
+                    except ValueError:
+                        pass
+                else:
+                    facts.scripts.append(
+                        {
+                            "src": element.get("src"),
+                            "async": element.get("async") is not None,
+                            "defer": element.get("defer") is not None,
+                            "inline_size": len(element.text or ""),
+                        }
+                    )
+
+            add_text(element.text)
+            continue
+
+        if tag in NON_CONTENT_TAGS:
+            skip_depth -= 1
+        elif tag == "label":
+            label_depth -= 1
+
+        parts = text_sinks.pop(element, None)
+        if parts is not None:
+            text = " ".join(" ".join(parts).split())
+            if tag == "title":
+                if facts.title is None:
+                    facts.title = text or None
+            elif tag == "a":
+                facts.anchors.append({"href": element.get("href"), "text": text})
+            else:
+                facts.headings.append((HEADING_TAGS[tag], text))
+
+        add_text(element.tail)
+
+    for form_field in facts.form_fields:
+        if form_field["id"] in labelled_ids:
+            form_field["labelled"] = True
+
+    return facts
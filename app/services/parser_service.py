@@ -1,15 +1,42 @@
+import asyncio
+from typing import Optional
 import aiohttp
 from bs4 import BeautifulSoup
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import uuid4
 from app.models.analysis import Analysis, AnalysisStatus
+from app.core.blob_store import blob_store
+from app.core.cache_invalidation import entity_tag, invalidation_bus
 from app.core.celery_app import celery_app
-from app.services.webhook_service import send_webhook_notification
+from app.core.config import settings as app_settings
+from app.core.http import http_client, known_charset
+from app.core.metrics import FETCH_BODY_BYTES
+from app.services.bounded_fetch import (
+    FetchLimitExceeded,
+    accept_encoding,
+    check_content_type,
+    iter_bounded_body,
+)
+from app.services.content_hash import compute_content_hash
+from app.services.fetch_cache import fetch_cache
+from app.services.html_parser import StreamingMetadataParser
+from app.services.webhook_service import notify_dispatcher, record_event
+
+
+def extract_metadata(html_content: str) -> dict:
+    """Extract page metadata from a fully downloaded document"""
+    soup = BeautifulSoup(html_content, "html.parser")
+    return {
+        "title": soup.title.string if soup.title else None,
+        "meta_tags": [tag.attrs for tag in soup.find_all("meta")],
+        "links": [link.attrs for link in soup.find_all("link")],
+    }
 
 
 class ParserService:
     async def create_analysis_request(
-        self, db: Session, url: str, settings: dict, user_id: str
+        self, db: AsyncSession, url: str, settings: dict, user_id: str
     ) -> Analysis:
         """Create initial analysis record"""
         analysis = Analysis(
@@ -20,8 +47,8 @@ class ParserService:
             correlation_id=str(uuid4()),
         )
         db.add(analysis)
-        db.commit()
-        db.refresh(analysis)
+        await db.commit()
+        await db.refresh(analysis)
         return analysis
 
     async def fetch_and_parse_website(self, analysis_id: str, db: Session):
@@ -29,43 +56,107 @@ class ParserService:
         analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(analysis.url) as response:
-                    html_content = await response.text()
-
-            # Parse HTML
-            soup = BeautifulSoup(html_content, "html.parser")
+            cached = None
+            if app_settings.FETCH_CACHE_ENABLED:
+                cached = await fetch_cache.get(analysis.url)
 
-            # Extract metadata
-            metadata = {
-                "title": soup.title.string if soup.title else None,
-                "meta_tags": [tag.attrs for tag in soup.find_all("meta")],
-                "links": [link.attrs for link in soup.find_all("link")],
-            }
+            html_content, metadata = await self._fetch(analysis.url, cached)
 
             # Save initial data
-            analysis.html_content = html_content
+            analysis.html_blob_key = await asyncio.to_thread(
+                blob_store.put_text, html_content
+            )
+            analysis.html_size = len(html_content.encode("utf-8"))
+            analysis.content_hash = compute_content_hash(html_content)
             analysis.metadata = metadata
             analysis.status = AnalysisStatus.PROCESSING
-            db.commit()
-
             # Notify about parsing completion
-            await send_webhook_notification(
-                analysis_id=analysis_id,
-                event_type="parsing_complete",
-                data={"metadata": metadata},
-            )
+            record_event(db, analysis_id, "parsing_complete", {"metadata": metadata})
+            db.commit()
+            await invalidation_bus.invalidate([entity_tag("analysis", analysis_id)])
+            notify_dispatcher()
 
             # Schedule analysis tasks
             celery_app.send_task(
                 "app.tasks.analysis.start_analysis_tasks", args=[analysis_id]
             )
 
+        except FetchLimitExceeded as e:
+            analysis.status = AnalysisStatus.FAILED
+            analysis.error_details = {"limit": e.limit, "detail": e.detail}
+            db.commit()
+            await invalidation_bus.invalidate([entity_tag("analysis", analysis_id)])
+            raise
+
         except Exception as e:
             analysis.status = AnalysisStatus.FAILED
             analysis.error_details = str(e)
             db.commit()
+            await invalidation_bus.invalidate([entity_tag("analysis", analysis_id)])
             raise
 
+    async def _fetch(self, url: str, cached: Optional[dict] = None):
+        """Fetch and parse a page, revalidating a cached copy when there is one"""
+        headers = {"Accept-Encoding": accept_encoding()}
+        headers.update(fetch_cache.conditional_headers(cached))
+
+        session = await http_client.get_session()
+        async with session.get(url, headers=headers, auto_decompress=False) as response:
+            if response.status == 304 and cached is not None:
+                html_content = await fetch_cache.get_body(cached)
+                if html_content is not None:
+                    return html_content, cached["metadata"]
+                # The body was evicted after its validators were read
+                response.release()
+                return await self._fetch(url)
+
+            html_content, metadata = await self._read_and_parse(response)
+            if (
+                app_settings.FETCH_CACHE_ENABLED
+                and response.status == 200
+                and "truncated" not in metadata
+            ):
+                await fetch_cache.store(url, response.headers, html_content, metadata)
+
+        return html_content, metadata
+
+    async def _read_and_parse(self, response: aiohttp.ClientResponse):
+        """
+        Read the body within the configured byte budget and extract metadata.
+        When a size limit trips, the page is truncated and whatever metadata
+        was seen so far is kept.
+        """
+        check_content_type(response)
+
+        # Unknown or bogus charsets fall back to utf-8, as aiohttp does
+        encoding = known_charset(response.charset) or "utf-8"
+        parser = None
+        if app_settings.HTML_STREAMING_PARSER:
+            parser = StreamingMetadataParser(encoding=encoding)
+
+        chunks = []
+        truncated = None
+        try:
+            async for chunk in iter_bounded_body(response):
+                if parser is not None:
+                    parser.feed(chunk)
+                chunks.append(chunk)
+        except FetchLimitExceeded as e:
+            if e.limit not in ("body_size", "decompressed_size"):
+                raise
+            truncated = e.limit
+
+        body = b"".join(chunks)
+        FETCH_BODY_BYTES.observe(len(body))
+        html_content = body.decode(encoding, errors="replace")
+
+        if parser is not None:
+            metadata = parser.close()
+        else:
+            metadata = extract_metadata(html_content)
+        if truncated:
+            metadata["truncated"] = truncated
+        return html_content, metadata
+
 
 parser_service = ParserService()
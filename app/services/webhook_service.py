@@ -1,71 +1,419 @@
+import asyncio
+import hmac
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
 import aiohttp
-from sqlalchemy.orm import Session
+import orjson
+from sqlalchemy import any_, func, or_
+from sqlalchemy.orm import Session, joinedload
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.http import http_client, known_charset
+from app.crud.crud_webhook import analysis_event as analysis_event_crud
+from app.crud.crud_webhook import webhook_delivery as webhook_delivery_crud
 from app.models.analysis import Analysis
 from app.models.webhook import WebhookConfig, WebhookDelivery
 from app.models.webhook import AnalysisEvent
 
+logger = logging.getLogger(__name__)
 
-async def send_webhook_notification(
-    analysis_id: str, event_type: str, data: dict, db: Session = None
-):
-    """Send webhook notification to all configured endpoints"""
-    if db is None:
-        db = SessionLocal()
+EPOCH = datetime(1970, 1, 1)
 
-    try:
-        # Create event record
-        event = AnalysisEvent(
-            analysis_id=analysis_id, event_type=event_type, event_data=data
-        )
-        db.add(event)
-        db.commit()
 
-        # Get webhook configs
-        webhook_configs = (
-            db.query(WebhookConfig)
-            .join(Analysis)
-            .filter(Analysis.id == analysis_id)
-            .filter(WebhookConfig.is_active == True)
-            .all()
-        )
+def retry_delay(retry_strategy: Optional[dict], attempt: int) -> float:
+    """
+    Seconds to wait before retrying after ``attempt`` failed attempts:
+    exponential backoff with full jitter
+    """
+    strategy = retry_strategy or {}
+    base = float(strategy.get("base_delay", settings.WEBHOOK_RETRY_BASE_DELAY))
+    cap = float(strategy.get("max_delay", settings.WEBHOOK_RETRY_MAX_DELAY))
+    multiplier = float(strategy.get("multiplier", settings.WEBHOOK_RETRY_MULTIPLIER))
+    return random.uniform(0, min(cap, base * multiplier ** (attempt - 1)))
 
-        # Send notifications
-        async with aiohttp.ClientSession() as session:
-            for config in webhook_configs:
-                try:
-                    async with session.post(
-                        config.url,
-                        json={
-                            "event": event_type,
-                            "analysisId": analysis_id,
-                            "data": data,
-                        },
-                        headers={"X-Webhook-Secret": config.secret},
-                    ) as response:
-                        # Record delivery
-                        delivery = WebhookDelivery(
-                            webhook_config_id=config.id,
-                            analysis_event_id=event.id,
-                            status="success" if response.status == 200 else "failed",
-                            response_details={
-                                "status": response.status,
-                                "body": await response.text(),
-                            },
-                        )
-                        db.add(delivery)
 
+class CircuitBreaker:
+    """
+    Stops calling an endpoint after consecutive failures. Once
+    ``reset_timeout`` has passed a single trial request is let through;
+    success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.trial_in_flight or time.monotonic() < self.retry_at:
+            return False
+        self.trial_in_flight = True
+        return True
+
+    @property
+    def retry_at(self) -> float:
+        return (self.opened_at or 0.0) + self.reset_timeout
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class WebhookDeliveryEngine:
+    """
+    Delivers webhook attempts concurrently, with a bounded number of requests
+    in flight. Failed attempts are rescheduled with backoff until the
+    config's retry_count is exhausted. A circuit breaker per endpoint URL
+    keeps chronically failing endpoints from tying up workers.
+    Breaker state is per process.
+    """
+
+    def __init__(self, concurrency: int, timeout: float):
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def _breaker(self, url: str) -> CircuitBreaker:
+        breaker = self._breakers.get(url)
+        if breaker is None:
+            breaker = self._breakers[url] = CircuitBreaker(
+                settings.WEBHOOK_BREAKER_FAILURE_THRESHOLD,
+                settings.WEBHOOK_BREAKER_RESET_TIMEOUT,
+            )
+        return breaker
+
+    async def deliver(self, deliveries: Sequence[WebhookDelivery]) -> None:
+        """
+        Attempt every delivery and record the outcome on the rows; the
+        caller commits. Deliveries need their config and event loaded.
+        Deliveries whose event was dropped by retention fail right away.
+        """
+        deliveries = [
+            delivery for delivery in deliveries if not _event_expired(delivery)
+        ]
+        semaphore = asyncio.Semaphore(self.concurrency)
+        session = await http_client.get_session()
+
+        async def attempt(batch: List[WebhookDelivery]):
+            async with semaphore:
+                try:
+                    await self._attempt(session, batch)
                 except Exception as e:
-                    # Record failed delivery
-                    delivery = WebhookDelivery(
-                        webhook_config_id=config.id,
-                        analysis_event_id=event.id,
-                        status="failed",
-                        error_details=str(e),
+                    # Keep one bad batch from losing the outcomes of the rest.
+                    # The attempt counts, so a permanent error ends in failure.
+                    logger.exception(
+                        "Webhook delivery to %s failed", batch[0].webhook_config.url
                     )
-                    db.add(delivery)
+                    for delivery in batch:
+                        delivery.attempt_count = (delivery.attempt_count or 0) + 1
+                    _record_failure(batch, {"error": str(e) or type(e).__name__})
+
+        await asyncio.gather(*(attempt(batch) for batch in _batches(deliveries)))
+
+    async def _attempt(
+        self, session: aiohttp.ClientSession, batch: List[WebhookDelivery]
+    ) -> None:
+        """Send one request for a batch of deliveries to the same config"""
+        config = batch[0].webhook_config
+        events = [event_payload(delivery.analysis_event) for delivery in batch]
+        if config.batch_window:
+            payload = {"event": "batch", "events": events}
+        else:
+            payload = events[0]
+        body = orjson.dumps(payload)
+
+        breaker = self._breaker(config.url)
+        if not breaker.allow():
+            # Not counted as an attempt; try again once the breaker half-opens
+            next_retry_at = datetime.utcnow() + timedelta(
+                seconds=max(breaker.retry_at - time.monotonic(), 0)
+            )
+            for delivery in batch:
+                delivery.status = "pending"
+                delivery.next_retry_at = next_retry_at
+            return
+
+        for delivery, event in zip(batch, events):
+            delivery.attempt_count = (delivery.attempt_count or 0) + 1
+            delivery.request_details = {
+                "url": config.url,
+                "payload": event,
+                "batch_size": len(batch),
+            }
+
+        try:
+            async with session.post(
+                config.url,
+                data=body,
+                headers=signature_headers(config.secret, body),
+                timeout=self.timeout,
+            ) as response:
+                response_details = {
+                    "status": response.status,
+                    "body": await read_truncated_body(
+                        response, settings.WEBHOOK_RESPONSE_BODY_MAX_BYTES
+                    ),
+                }
+                succeeded = 200 <= response.status < 300
+        except Exception as e:
+            # Anything short of a response counts against the endpoint, which
+            # also ends a half-open breaker's trial
+            if not isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError)):
+                logger.exception("Webhook request to %s failed", config.url)
+            response_details = {"error": str(e) or type(e).__name__}
+            succeeded = False
+
+        if succeeded:
+            breaker.record_success()
+            for delivery in batch:
+                delivery.response_details = response_details
+                delivery.status = "success"
+                delivery.next_retry_at = None
+            return
+
+        breaker.record_failure()
+        _record_failure(batch, response_details)
+
+
+def _record_failure(batch: List[WebhookDelivery], response_details: dict) -> None:
+    """Reschedule a failed batch with backoff, or give up on exhausted deliveries"""
+    config = batch[0].webhook_config
+    # The batch is retried together
+    attempt = max(delivery.attempt_count for delivery in batch)
+    next_retry_at = datetime.utcnow() + timedelta(
+        seconds=retry_delay(config.retry_strategy, attempt)
+    )
+    for delivery in batch:
+        delivery.response_details = response_details
+        if delivery.attempt_count <= (config.retry_count or 0):
+            delivery.status = "pending"
+            delivery.next_retry_at = next_retry_at
+        else:
+            delivery.status = "failed"
+            delivery.next_retry_at = None
+
+
+def _event_expired(delivery: WebhookDelivery) -> bool:
+    if delivery.analysis_event is not None:
+        return False
+    delivery.status = "failed"
+    delivery.next_retry_at = None
+    delivery.response_details = {"error": "event expired"}
+    return True
 
-        db.commit()
 
+def event_payload(event: AnalysisEvent) -> dict:
+    return {
+        "event": event.event_type,
+        "analysisId": str(event.analysis_id),
+        "data": event.event_data,
+    }
+
+
+async def read_truncated_body(response: aiohttp.ClientResponse, limit: int) -> str:
+    """
+    At most ``limit`` bytes of the response body, decoded for storage. The
+    rest is never downloaded.
+    """
+    body = bytearray()
+    async for chunk in response.content.iter_chunked(limit or 1):
+        body += chunk
+        if len(body) >= limit:
+            break
+    encoding = known_charset(response.charset) or "utf-8"
+    return bytes(body[:limit]).decode(encoding, errors="replace")
+
+
+def signature_headers(secret: str, body: bytes) -> dict:
+    """
+    Headers for a request body signed with the webhook secret:
+    hex HMAC-SHA256 of "<timestamp>.<body>"
+    """
+    timestamp = str(int(time.time()))
+    signature = hmac.new(
+        secret.encode("utf-8"), timestamp.encode("ascii") + b"." + body, "sha256"
+    ).hexdigest()
+    headers = {
+        "Content-Type": "application/json",
+        "X-Webhook-Timestamp": timestamp,
+        "X-Webhook-Signature": f"sha256={signature}",
+    }
+    if settings.WEBHOOK_SEND_SECRET_HEADER:
+        headers["X-Webhook-Secret"] = secret
+    return headers
+
+
+def subscribed_to(event_type: str):
+    """
+    Filter for configs that receive event_type: those listing it in
+    event_types, and those with an empty (or NULL) list, which receive
+    every event
+    """
+    return or_(
+        event_type == any_(WebhookConfig.event_types),
+        func.coalesce(func.cardinality(WebhookConfig.event_types), 0) == 0,
+    )
+
+
+def _batches(deliveries: Sequence[WebhookDelivery]) -> List[List[WebhookDelivery]]:
+    """
+    One batch per delivery, except for configs with batching enabled, whose
+    deliveries are grouped into batches of up to batch_max_size
+    """
+    batches = []
+    grouped: Dict[UUID, List[WebhookDelivery]] = {}
+    for delivery in deliveries:
+        config = delivery.webhook_config
+        if config.batch_window:
+            grouped.setdefault(config.id, []).append(delivery)
+        else:
+            batches.append([delivery])
+    for group in grouped.values():
+        size = _batch_max_size(group[0].webhook_config)
+        batches.extend(group[i : i + size] for i in range(0, len(group), size))
+    return batches
+
+
+def _batch_max_size(config: WebhookConfig) -> int:
+    return config.batch_max_size or settings.WEBHOOK_BATCH_MAX_SIZE
+
+
+def _window_end(now: datetime, window: int) -> datetime:
+    """End of the batching window containing now; windows are epoch-aligned"""
+    elapsed = (now - EPOCH).total_seconds()
+    return now + timedelta(seconds=window - elapsed % window)
+
+
+webhook_engine = WebhookDeliveryEngine(
+    concurrency=settings.WEBHOOK_CONCURRENCY, timeout=settings.WEBHOOK_TIMEOUT
+)
+
+
+def record_event(db: Session, analysis_id: str, event_type: str, data: dict) -> UUID:
+    """
+    Outbox write: add the event and a pending delivery per subscribed webhook
+    to the caller's transaction, so they commit (or roll back) together with
+    the state change they describe. Delivery happens in the dispatcher.
+
+    A config receives the events listed in its event_types, or every event
+    when the list is empty. For configs with batching enabled the delivery
+    is due at the end of the current window, or right away once
+    batch_max_size events are waiting.
+
+    Rows are written with bulk inserts, one statement per table. Returns
+    the event id.
+    """
+    # Get webhook configs subscribed to this event
+    webhook_configs = (
+        db.query(WebhookConfig)
+        .join(Analysis, Analysis.website_id == WebhookConfig.website_id)
+        .filter(Analysis.id == analysis_id)
+        .filter(WebhookConfig.is_active.is_(True))
+        .filter(subscribed_to(event_type))
+        .all()
+    )
+
+    # The event and its deliveries share a timestamp, so they land in the
+    # same monthly partition and are dropped together
+    now = datetime.utcnow()
+    (event_id,) = analysis_event_crud.create_many(
+        db,
+        [
+            {
+                "analysis_id": analysis_id,
+                "event_type": event_type,
+                "event_data": data,
+                "created_at": now,
+            }
+        ],
+    )
+    webhook_delivery_crud.create_many(
+        db,
+        [
+            {
+                "created_at": now,
+                "webhook_config_id": config.id,
+                "analysis_event_id": event_id,
+                "status": "pending",
+                "attempt_count": 0,
+                "next_retry_at": (
+                    _window_end(now, config.batch_window)
+                    if config.batch_window
+                    else now
+                ),
+            }
+            for config in webhook_configs
+        ],
+    )
+
+    batching = {config.id: config for config in webhook_configs if config.batch_window}
+    if batching:
+        waiting = (
+            db.query(WebhookDelivery.webhook_config_id, func.count())
+            .filter(WebhookDelivery.webhook_config_id.in_(batching))
+            .filter(WebhookDelivery.status == "pending")
+            .filter(WebhookDelivery.attempt_count == 0)
+            .group_by(WebhookDelivery.webhook_config_id)
+            .all()
+        )
+        full = [
+            config_id
+            for config_id, count in waiting
+            if count >= _batch_max_size(batching[config_id])
+        ]
+        if full:
+            # Flush full batches without waiting for the window to close
+            db.query(WebhookDelivery).filter(
+                WebhookDelivery.webhook_config_id.in_(full),
+                WebhookDelivery.status == "pending",
+                WebhookDelivery.attempt_count == 0,
+            ).update({"next_retry_at": now}, synchronize_session=False)
+    return event_id
+
+
+def notify_dispatcher() -> None:
+    """Wake the dispatcher after committing new events, instead of waiting for beat"""
+    celery_app.send_task("app.tasks.webhooks.dispatch_webhooks")
+
+
+async def dispatch_due_deliveries(db: Session, limit: int) -> int:
+    """
+    Claim a batch of due deliveries and attempt them. Rows are locked with
+    SKIP LOCKED until the batch commits, so any number of dispatchers can
+    run side by side without delivering the same row twice. Outcomes are
+    committed even if delivery is interrupted, so sent rows are not sent
+    again.
+    """
+    deliveries = (
+        db.query(WebhookDelivery)
+        .options(
+            joinedload(WebhookDelivery.webhook_config),
+            joinedload(WebhookDelivery.analysis_event),
+        )
+        .filter(WebhookDelivery.status == "pending")
+        .filter(WebhookDelivery.next_retry_at <= datetime.utcnow())
+        .order_by(WebhookDelivery.next_retry_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True, of=WebhookDelivery)
+        .all()
+    )
+    try:
+        await webhook_engine.deliver(deliveries)
     finally:
-        if db:
-            db.close()
+        db.commit()
+    return len(deliveries)
@@ -1,7 +1,9 @@
 from celery import chain
-from app.core.celery_app import celery_app
+from app.core.celery_app import celery_app, run_async
 from app.db.session import SessionLocal
-from app.services import parser_service, analyzer_service, recommender_service
+from app.services.parser_service import parser_service
+from app.services.analyzer_service import analyzer_service
+from app.services import recommender_service
 
 
 @celery_app.task
@@ -25,7 +27,7 @@ def parse_website(analysis_id: str):
     """Parse website content"""
     db = SessionLocal()
     try:
-        parser_service.fetch_and_parse_website(analysis_id, db)
+        run_async(parser_service.fetch_and_parse_website(analysis_id, db))
         return analysis_id
     finally:
         db.close()
@@ -36,7 +38,9 @@ def run_analysis(analysis_id: str):
     """Run all analysis tasks"""
     db = SessionLocal()
     try:
-        analyzer_service.run_parallel_analysis(analysis_id, db)
+        # Identical content analysed by the same analyzer version is reused
+        if not run_async(analyzer_service.reuse_previous_results(analysis_id, db)):
+            run_async(analyzer_service.run_parallel_analysis(analysis_id, db))
         return analysis_id
     finally:
         db.close()
@@ -0,0 +1,26 @@
+import logging
+from datetime import datetime
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.db.partitions import maintain_partitions
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task
+def maintain_event_partitions():
+    """
+    Create upcoming monthly partitions of the event and delivery tables and
+    drop partitions past EVENT_RETENTION_DAYS
+    """
+    with engine.begin() as conn:
+        dropped = maintain_partitions(
+            conn,
+            datetime.utcnow(),
+            premake_months=settings.EVENT_PARTITION_PREMAKE_MONTHS,
+            retention_days=settings.EVENT_RETENTION_DAYS,
+        )
+    for name in dropped:
+        logger.info("Dropped expired partition %s", name)
+    return dropped
@@ -0,0 +1,26 @@
+from app.core.celery_app import celery_app, run_async
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.webhook_service import dispatch_due_deliveries
+
+
+@celery_app.task
+def dispatch_webhooks():
+    """
+    Deliver due webhooks from the outbox. Runs on the "webhooks" queue, so
+    delivery scales with dedicated dispatcher workers and never holds up
+    the analysis pipeline.
+    """
+    delivered = 0
+    for _ in range(settings.WEBHOOK_DISPATCH_MAX_BATCHES):
+        db = SessionLocal()
+        try:
+            claimed = run_async(
+                dispatch_due_deliveries(db, limit=settings.WEBHOOK_DISPATCH_BATCH_SIZE)
+            )
+        finally:
+            db.close()
+        delivered += claimed
+        if claimed < settings.WEBHOOK_DISPATCH_BATCH_SIZE:
+            break
+    return delivered
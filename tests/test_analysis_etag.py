@@ -0,0 +1,56 @@
+from uuid import uuid4
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.api.v1.endpoints import analysis as analysis_endpoints
+from app.schemas.user import UserPrincipal
+from app.services.analyzer_service import AnalysisPayload
+
+ETAG = '"0123456789abcdef"'
+CONTENT = b'{"status":"completed"}'
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def get_payload(analysis_id, user_id):
+        return AnalysisPayload(content=CONTENT, etag=ETAG, finished=True)
+
+    monkeypatch.setattr(
+        analysis_endpoints.analyzer_service,
+        "get_complete_analysis_payload",
+        get_payload,
+    )
+    app = FastAPI()
+    app.include_router(analysis_endpoints.router)
+    app.dependency_overrides[deps.get_current_user] = lambda: UserPrincipal(
+        id=uuid4(),
+        email="user@example.com",
+        is_active=True,
+        is_superuser=False,
+        subscription_tier="free",
+    )
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    [ETAG, f"W/{ETAG}", f'"other", {ETAG}', f'W/"other",W/{ETAG}', "*"],
+)
+def test_matching_etag_is_not_modified(client, if_none_match):
+    response = client.get("/some-id", headers={"If-None-Match": if_none_match})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == ETAG
+
+
+@pytest.mark.parametrize("if_none_match", [None, '"other"', 'W/"other", "stale"'])
+def test_other_etags_get_the_body(client, if_none_match):
+    headers = {"If-None-Match": if_none_match} if if_none_match else {}
+
+    response = client.get("/some-id", headers=headers)
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["ETag"] == ETAG
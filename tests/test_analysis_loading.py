@@ -0,0 +1,140 @@
+import uuid
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+from app.crud.crud_analysis import analysis as analysis_crud
+from app.models import (
+    AccessibilityData,
+    Analysis,
+    AnalysisStatus,
+    PerformanceData,
+    SecurityData,
+    SEOData,
+    User,
+    Website,
+)
+
+TABLES = [
+    model.__table__
+    for model in (
+        User,
+        Website,
+        Analysis,
+        SEOData,
+        PerformanceData,
+        SecurityData,
+        AccessibilityData,
+    )
+]
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    User.metadata.create_all(engine, tables=TABLES)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def website(engine):
+    with Session(engine) as db:
+        user = User(id=uuid.uuid4(), email="owner@example.com", password_hash="x")
+        website = Website(
+            id=uuid.uuid4(), name="Example", domain="example.com", user=user
+        )
+        db.add(website)
+        for i in range(3):
+            analysis = Analysis(
+                website=website,
+                created_by=user.id,
+                correlation_id=f"c{i}",
+                url=f"https://example.com/{i}",
+                status=AnalysisStatus.COMPLETED,
+                analysis_settings={"depth": i},
+            )
+            analysis.seo_data = SEOData(title_exists=True)
+            analysis.performance_data = PerformanceData(total_page_size=1000.0)
+            analysis.security_data = SecurityData(https_enabled=True)
+            analysis.accessibility_data = AccessibilityData(alt_missing_count=0)
+            db.add(analysis)
+        db.commit()
+        return website.id
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def any_analysis_id(engine) -> uuid.UUID:
+    with Session(engine) as db:
+        return db.query(Analysis.id).first()[0]
+
+
+def test_detail_loads_everything_in_one_statement(engine, website):
+    analysis_id = any_analysis_id(engine)
+
+    with Session(engine) as db, count_statements(engine) as statements:
+        analysis = analysis_crud.get_detail(db, id=analysis_id)
+        rendered = (
+            analysis.seo_data.title_exists,
+            analysis.performance_data.total_page_size,
+            analysis.security_data.https_enabled,
+            analysis.accessibility_data.alt_missing_count,
+            analysis.analysis_settings,
+        )
+
+    assert rendered[0] is True
+    assert len(statements) == 1
+
+
+def test_detail_raises_instead_of_lazy_loading(engine, website):
+    analysis_id = any_analysis_id(engine)
+
+    with Session(engine) as db:
+        analysis = analysis_crud.get_detail(db, id=analysis_id)
+        with pytest.raises(InvalidRequestError):
+            analysis.website
+        with pytest.raises(InvalidRequestError):
+            analysis.events
+
+
+def test_summary_list_is_one_statement(engine, website):
+    with Session(engine) as db, count_statements(engine) as statements:
+        items = analysis_crud.get_by_website(db, website_id=website)
+        urls = [item.url for item in items]
+
+    assert len(urls) == 3
+    assert len(statements) == 1
+
+
+def test_keyset_page_is_one_statement(engine, website):
+    with Session(engine) as db, count_statements(engine) as statements:
+        items, cursor = analysis_crud.get_page_by_website(
+            db, website_id=website, limit=2
+        )
+        statuses = [item.status for item in items]
+
+    assert len(statuses) == 2 and cursor is not None
+    assert len(statements) == 1
+
+
+def test_summaries_raise_instead_of_loading_relationships(engine, website):
+    with Session(engine) as db:
+        (item,) = analysis_crud.get_by_website(db, website_id=website, limit=1)
+        with pytest.raises(InvalidRequestError):
+            item.seo_data
+        with pytest.raises(InvalidRequestError):
+            item.performance_data
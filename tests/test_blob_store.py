@@ -0,0 +1,19 @@
+import pytest
+from app.core.blob_store import BlobStore, LocalBlobStore
+
+
+def test_blob_store_is_abstract():
+    with pytest.raises(TypeError):
+        BlobStore()
+
+
+@pytest.mark.parametrize("compression", ["zstd", "gzip"])
+def test_local_round_trip(tmp_path, compression):
+    store = LocalBlobStore(str(tmp_path), compression=compression)
+    key = store.put_text("<p>Café</p>")
+
+    assert store.put_text("<p>Café</p>") == key
+    assert store.get_text(key) == "<p>Café</p>"
+
+    store.delete(key)
+    assert store.get(key) is None
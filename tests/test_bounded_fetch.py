@@ -0,0 +1,113 @@
+import gzip
+import zlib
+import pytest
+from app.core.config import settings
+from app.services import bounded_fetch
+from app.services.bounded_fetch import (
+    BoundedDecoder,
+    FetchLimitExceeded,
+    check_content_type,
+    iter_bounded_body,
+)
+
+# brotli is optional, and only used when it can cap its output
+requires_brotli = pytest.mark.skipif(
+    bounded_fetch.brotli is None, reason="bounded brotli decoding unavailable"
+)
+
+
+def brotli_compress(data: bytes) -> bytes:
+    return bounded_fetch.brotli.compress(data)
+
+
+class FakeContent:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def iter_chunked(self, size: int):
+        for i in range(0, len(self.body), size):
+            yield self.body[i : i + size]
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, encoding: str = "", content_type="text/html"):
+        self.content = FakeContent(body)
+        self.headers = {"Content-Encoding": encoding}
+        self.content_length = len(body)
+        self.content_type = content_type
+
+
+async def read(response, chunk_size: int = 64) -> bytes:
+    return b"".join([chunk async for chunk in iter_bounded_body(response, chunk_size)])
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "FETCH_MAX_BODY_BYTES", 1000)
+    monkeypatch.setattr(settings, "FETCH_MAX_DECOMPRESSED_BYTES", 10_000)
+
+
+@pytest.mark.parametrize(
+    "encoding, compress",
+    [
+        ("", lambda data: data),
+        ("gzip", gzip.compress),
+        ("deflate", zlib.compress),
+        pytest.param("br", brotli_compress, marks=requires_brotli),
+    ],
+)
+async def test_reads_body_within_budget(limits, encoding, compress):
+    body = b"<p>hello</p>" * 50
+    assert await read(FakeResponse(compress(body), encoding)) == body
+
+
+async def test_raw_deflate_stream(limits):
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    raw = compressor.compress(b"hello") + compressor.flush()
+    assert await read(FakeResponse(raw, "deflate")) == b"hello"
+
+
+async def test_oversized_body_is_read_up_to_the_budget(limits):
+    chunks = []
+    with pytest.raises(FetchLimitExceeded) as exc:
+        async for chunk in iter_bounded_body(FakeResponse(b"x" * 5000), 300):
+            chunks.append(chunk)
+    assert exc.value.limit == "body_size"
+    assert b"".join(chunks) == b"x" * 1000
+
+
+@pytest.mark.parametrize(
+    "encoding, compress",
+    [
+        ("gzip", gzip.compress),
+        pytest.param("br", brotli_compress, marks=requires_brotli),
+    ],
+)
+async def test_decompression_bomb_trips(limits, monkeypatch, encoding, compress):
+    monkeypatch.setattr(settings, "FETCH_MAX_BODY_BYTES", 100_000)
+    bomb = compress(b"\0" * 10_000_000)
+    with pytest.raises(FetchLimitExceeded) as exc:
+        await read(FakeResponse(bomb, encoding), chunk_size=len(bomb))
+    assert exc.value.limit == "decompressed_size"
+
+
+@requires_brotli
+def test_brotli_output_is_capped_per_chunk():
+    decoder = BoundedDecoder("br", max_size=1000)
+    with pytest.raises(FetchLimitExceeded):
+        decoder.decode(brotli_compress(b"\0" * 10_000_000))
+    # The decompressor stopped near the budget instead of inflating it all
+    assert not decoder._brotli.can_accept_more_data()
+
+
+def test_unsupported_encoding():
+    with pytest.raises(FetchLimitExceeded) as exc:
+        BoundedDecoder("compress", max_size=1000)
+    assert exc.value.limit == "content_encoding"
+
+
+def test_content_type_allowlist():
+    check_content_type(FakeResponse(b"", content_type="text/html"))
+    with pytest.raises(FetchLimitExceeded) as exc:
+        check_content_type(FakeResponse(b"", content_type="application/pdf"))
+    assert exc.value.limit == "content_type"
@@ -0,0 +1,79 @@
+from typing import List
+import orjson
+import pytest
+from pydantic import BaseModel
+from app.core import cache_codec
+from app.core.cache_codec import CacheCodec
+
+requires_zstd = pytest.mark.skipif(
+    cache_codec.zstandard is None, reason="zstandard not installed"
+)
+requires_msgpack = pytest.mark.skipif(
+    cache_codec.msgpack is None, reason="msgpack not installed"
+)
+
+
+class Report(BaseModel):
+    url: str
+    score: int
+    issues: List[str]
+
+
+REPORT = Report(url="https://example.com/", score=87, issues=["missing alt"] * 3)
+
+
+def codec(**kwargs) -> CacheCodec[Report]:
+    kwargs.setdefault("serializer", "orjson")
+    kwargs.setdefault("compress_min_bytes", 1 << 20)
+    return CacheCodec(Report, schema_version=2, **kwargs)
+
+
+def test_round_trip():
+    c = codec()
+    payload = c.encode(REPORT)
+
+    assert c.decode(payload) == REPORT
+    assert c.loads(payload) == REPORT.model_dump(mode="json")
+    assert orjson.loads(c.to_json(payload)) == REPORT.model_dump(mode="json")
+
+
+@requires_zstd
+def test_round_trip_compressed():
+    c = codec(compress_min_bytes=0)
+    payload = c.encode(REPORT)
+
+    assert payload[3] & cache_codec.FLAG_ZSTD
+    assert c.decode(payload) == REPORT
+    assert orjson.loads(c.to_json(payload)) == REPORT.model_dump(mode="json")
+
+
+@requires_msgpack
+def test_round_trip_msgpack():
+    c = codec(serializer="msgpack")
+    payload = c.encode(REPORT)
+
+    assert payload[3] & cache_codec.FLAG_MSGPACK
+    assert c.decode(payload) == REPORT
+    assert orjson.loads(c.to_json(payload)) == REPORT.model_dump(mode="json")
+
+
+def test_other_schema_version_is_a_miss():
+    payload = codec().encode(REPORT)
+    newer = CacheCodec(Report, schema_version=3, serializer="orjson")
+
+    assert newer.decode(payload) is None
+    assert newer.to_json(payload) is None
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        None,
+        b"",
+        b"SB",
+        orjson.dumps(REPORT.model_dump(mode="json")),
+        b"XX\x01\x00\x00\x02{}",
+    ],
+)
+def test_unframed_payloads_are_misses(payload):
+    assert codec().decode(payload) is None
@@ -0,0 +1,21 @@
+from app.services.content_hash import compute_content_hash, normalize_html
+
+
+def test_formatting_and_comments_are_ignored():
+    a = "<html>\n  <body><p>Hello   world</p></body>\n</html>"
+    b = "<html><!-- generated 2026-10-17 --> <body><p>Hello world</p></body> </html>"
+    assert compute_content_hash(a) == compute_content_hash(b)
+
+
+def test_content_changes_change_the_hash():
+    assert compute_content_hash("<p>Hello</p>") != compute_content_hash("<p>Bye</p>")
+
+
+def test_normalize_html():
+    assert normalize_html("<p>\n\ta  b</p> <!--\nx\n-->") == "<p> a b</p>"
+
+
+def test_hash_is_hex_sha256():
+    digest = compute_content_hash("<p>x</p>")
+    assert len(digest) == 64
+    int(digest, 16)
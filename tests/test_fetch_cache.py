@@ -0,0 +1,130 @@
+import pytest
+from app.core.blob_store import LocalBlobStore
+from app.core.config import settings
+from app.services import parser_service as parser_module
+from app.services.fetch_cache import FetchCache
+from app.services.parser_service import ParserService
+
+URL = "https://example.com/"
+PAGE = "<html><head><title>Cached</title></head><body>Hi</body></html>"
+VALIDATORS = {"ETag": '"v1"', "Last-Modified": "Sat, 17 Oct 2026 12:00:00 GMT"}
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, expire=None):
+        self.data[key] = value
+
+
+class FakeContent:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def iter_chunked(self, size):
+        yield self.body
+
+
+class FakeResponse:
+    charset = "utf-8"
+    content_type = "text/html"
+
+    def __init__(self, status, body=b"", headers=None):
+        self.status = status
+        self.content = FakeContent(body)
+        self.content_length = len(body)
+        self.headers = headers or {}
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+class FakeSession:
+    """Answers with the queued responses and records the request headers"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(headers)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    cache = FetchCache(FakeRedis(), LocalBlobStore(str(tmp_path)))
+    monkeypatch.setattr(parser_module, "fetch_cache", cache)
+    monkeypatch.setattr(settings, "FETCH_CACHE_ENABLED", True)
+    return cache
+
+
+def serve(monkeypatch, *responses) -> FakeSession:
+    session = FakeSession(*responses)
+
+    async def get_session():
+        return session
+
+    monkeypatch.setattr(parser_module.http_client, "get_session", get_session)
+    return session
+
+
+async def test_no_validators_are_stored_without_etag_or_last_modified(
+    monkeypatch, cache
+):
+    serve(monkeypatch, FakeResponse(200, PAGE.encode()))
+
+    html_content, _ = await ParserService()._fetch(URL)
+
+    assert html_content == PAGE
+    assert await cache.get(URL) is None
+    assert cache.conditional_headers(None) == {}
+
+
+async def test_cached_validators_are_sent(monkeypatch, cache):
+    serve(monkeypatch, FakeResponse(200, PAGE.encode(), VALIDATORS))
+    await ParserService()._fetch(URL)
+    session = serve(monkeypatch, FakeResponse(200, PAGE.encode(), VALIDATORS))
+
+    await ParserService()._fetch(URL, await cache.get(URL))
+
+    assert session.requests[0]["If-None-Match"] == '"v1"'
+    assert session.requests[0]["If-Modified-Since"] == VALIDATORS["Last-Modified"]
+
+
+async def test_not_modified_reuses_the_stored_body(monkeypatch, cache):
+    serve(monkeypatch, FakeResponse(200, PAGE.encode(), VALIDATORS))
+    _, metadata = await ParserService()._fetch(URL)
+    session = serve(monkeypatch, FakeResponse(304))
+
+    cached = await cache.get(URL)
+    assert await ParserService()._fetch(URL, cached) == (PAGE, metadata)
+    assert len(session.requests) == 1
+
+
+async def test_not_modified_with_an_evicted_body_refetches(monkeypatch, cache):
+    serve(monkeypatch, FakeResponse(200, PAGE.encode(), VALIDATORS))
+    await ParserService()._fetch(URL)
+    cached = await cache.get(URL)
+    cache.blobs.delete(cached["body_hash"])
+    not_modified = FakeResponse(304)
+    session = serve(monkeypatch, not_modified, FakeResponse(200, b"<p>New</p>"))
+
+    html_content, _ = await ParserService()._fetch(URL, cached)
+
+    assert html_content == "<p>New</p>"
+    assert not_modified.released
+    assert "If-None-Match" in session.requests[0]
+    assert "If-None-Match" not in session.requests[1]
+    assert "If-Modified-Since" not in session.requests[1]
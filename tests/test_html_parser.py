@@ -0,0 +1,46 @@
+import pytest
+from app.core.http import known_charset
+from app.services.html_parser import StreamingMetadataParser
+from app.services.parser_service import extract_metadata
+
+PAGE = (
+    "<html><head><title>Café</title>"
+    '<meta name="description" content="Fresh coffee">'
+    '<link rel="canonical stylesheet" href="https://example.com/">'
+    "</head><body><h1>Menu</h1></body></html>"
+)
+
+
+def parse(body: bytes, encoding=None, chunk_size: int = 7) -> dict:
+    parser = StreamingMetadataParser(encoding=encoding)
+    for i in range(0, len(body), chunk_size):
+        parser.feed(body[i : i + chunk_size])
+    return parser.close()
+
+
+def test_matches_beautifulsoup_metadata():
+    assert parse(PAGE.encode("utf-8"), "utf-8") == extract_metadata(PAGE)
+
+
+def test_multi_valued_attributes_are_split():
+    metadata = parse(PAGE.encode("utf-8"), "utf-8")
+    assert metadata["links"] == [
+        {"rel": ["canonical", "stylesheet"], "href": "https://example.com/"}
+    ]
+
+
+@pytest.mark.parametrize("encoding", ["x-user-defined", "mac-roman"])
+def test_charset_unknown_to_lxml_falls_back_to_utf8(encoding):
+    assert parse(PAGE.encode("utf-8"), encoding)["title"] == "Café"
+
+
+def test_empty_document():
+    assert parse(b"") == {"title": None, "meta_tags": [], "links": []}
+
+
+@pytest.mark.parametrize(
+    "charset, expected",
+    [("utf-8", "utf-8"), ("ISO-8859-1", "ISO-8859-1"), ("x-user-defined", None)],
+)
+def test_known_charset(charset, expected):
+    assert known_charset(charset) == expected
@@ -0,0 +1,72 @@
+import time
+from app.core.local_cache import LocalCache
+
+
+def test_evicts_least_recently_used_beyond_max_bytes():
+    cache = LocalCache(max_bytes=10, ttl=60)
+    cache.set("a", "A", 4)
+    cache.set("b", "B", 4)
+    cache.get("a")
+
+    cache.set("c", "C", 4)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+    assert cache.size == 8
+
+
+def test_skips_values_larger_than_the_cache():
+    cache = LocalCache(max_bytes=10, ttl=60)
+    cache.set("a", "A", 4)
+
+    cache.set("big", "B", 11)
+
+    assert cache.get("big") is None
+    assert cache.get("a") == "A"
+
+
+def test_replacing_a_key_releases_its_size():
+    cache = LocalCache(max_bytes=10, ttl=60)
+    cache.set("a", "A", 4)
+    cache.set("a", "A2", 6)
+
+    assert cache.size == 6
+    assert cache.get("a") == "A2"
+
+
+def test_entries_expire(monkeypatch):
+    cache = LocalCache(max_bytes=10, ttl=60)
+    cache.set("a", "A", 4)
+    cache.set("b", "B", 4, ttl=1)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 2)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.size == 4
+
+
+def test_invalidating_a_tag_drops_every_tagged_entry():
+    cache = LocalCache(max_bytes=100, ttl=60)
+    cache.set("detail", "D", 4, tags=["analysis:1"])
+    cache.set("summary", "S", 4, tags=["analysis:1", "user:1"])
+    cache.set("other", "O", 4, tags=["analysis:2"])
+
+    cache.invalidate("analysis:1")
+
+    assert cache.get("detail") is None and cache.get("summary") is None
+    assert cache.get("other") == "O"
+    assert cache._tags == {"analysis:2": {"other"}}
+
+
+def test_invalidating_a_key_or_everything():
+    cache = LocalCache(max_bytes=100, ttl=60)
+    cache.set("a", "A", 4)
+    cache.set("b", "B", 4)
+
+    cache.invalidate("a")
+    assert cache.get("a") is None and cache.get("b") == "B"
+
+    cache.invalidate(None)
+    assert cache.get("b") is None
+    assert cache.size == 0
@@ -0,0 +1,28 @@
+from prometheus_client import generate_latest
+from app.core import metrics
+from app.core.redis import redis_client
+
+
+def pool_samples(registry) -> str:
+    text = generate_latest(registry).decode()
+    return "\n".join(
+        line
+        for line in text.splitlines()
+        if line.startswith("siteboost_redis_pool_connections{")
+    )
+
+
+def test_redis_pool_gauge_is_exported():
+    samples = pool_samples(metrics.metrics_registry())
+
+    for state in ("in_use", "idle", "max"):
+        assert f'state="{state}"' in samples
+    max_connections = redis_client.pool_stats()["max"]
+    assert f'{{state="max"}} {float(max_connections)}' in samples
+
+
+def test_redis_pool_gauge_is_exported_in_multiprocess_mode(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics, "MULTIPROCESS", True)
+
+    assert 'state="in_use"' in pool_samples(metrics.metrics_registry())
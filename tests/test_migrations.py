@@ -0,0 +1,67 @@
+import importlib.util
+import io
+import re
+from pathlib import Path
+import pytest
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+import app.models  # noqa: F401 - registers every table on the metadata
+from app.db.base import Base
+
+VERSIONS = Path(__file__).resolve().parent.parent / "alembic" / "versions"
+
+
+def render(revision: str, step: str) -> str:
+    """SQL emitted by a migration step, rendered offline for PostgreSQL"""
+    (path,) = VERSIONS.glob(f"{revision}_*.py")
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    buffer = io.StringIO()
+    context = MigrationContext.configure(
+        dialect_name="postgresql", opts={"as_sql": True, "output_buffer": buffer}
+    )
+    with Operations.context(context):
+        getattr(module, step)()
+    return buffer.getvalue()
+
+
+INDEX_REVISIONS = ["c4d7a9e2f153", "e2a6f0b8d417"]
+
+
+@pytest.mark.parametrize("revision", INDEX_REVISIONS)
+def test_indexes_match_the_models(revision):
+    created = re.findall(
+        r'CREATE INDEX CONCURRENTLY (\w+) ON "?(\w+)"?', render(revision, "upgrade")
+    )
+    declared = {
+        (index.name, table.name)
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+    }
+
+    assert created
+    assert set(created) <= declared
+
+
+@pytest.mark.parametrize("revision", INDEX_REVISIONS)
+def test_downgrade_drops_the_indexes(revision):
+    created = re.findall(
+        r"CREATE INDEX CONCURRENTLY (\w+)", render(revision, "upgrade")
+    )
+    dropped = re.findall(
+        r"DROP INDEX CONCURRENTLY (\w+)", render(revision, "downgrade")
+    )
+
+    assert sorted(dropped) == sorted(created)
+
+
+@pytest.mark.parametrize("revision", INDEX_REVISIONS)
+@pytest.mark.parametrize("step", ["upgrade", "downgrade"])
+def test_index_builds_run_outside_the_migration_transaction(revision, step):
+    sql = render(revision, step).strip()
+
+    # The autocommit block ends the migration's transaction before the
+    # index statements and opens a new one after them
+    assert sql.startswith("COMMIT;")
+    assert sql.endswith("BEGIN;")
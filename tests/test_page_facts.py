@@ -0,0 +1,79 @@
+from app.services.page_facts import extract_page_facts
+
+URL = "https://example.com/"
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <title> Coffee   &amp; Tea </title>
+  <meta name="description" content="Fresh coffee">
+  <meta property="og:title" content="Coffee">
+  <link rel="canonical" href="https://example.com/">
+  <link rel="stylesheet" href="/site.css">
+  <script type="application/ld+json">{"@type": "Organization"}</script>
+  <script src="/app.js" defer></script>
+  <style>body { color: red }</style>
+</head>
+<body>
+  <h1>Our <em>menu</em></h1>
+  <h2>Drinks</h2>
+  <img src="/a.png" alt="A cup">
+  <img src="/b.png">
+  <form action="/order" method="post">
+    <label for="name">Name</label><input id="name" type="text">
+    <label>Email <input type="email"></label>
+    <input type="text" id="unlabelled">
+    <input type="submit">
+  </form>
+  <a href="/about">About us</a>
+</body>
+</html>"""
+
+
+def test_collects_document_facts():
+    facts = extract_page_facts(PAGE, url=URL)
+
+    assert facts.title == "Coffee & Tea"
+    assert facts.lang == "en"
+    assert facts.description == "Fresh coffee"
+    assert facts.open_graph == {"og:title": "Coffee"}
+    assert facts.canonical_url == "https://example.com/"
+    assert facts.stylesheets == ["/site.css"]
+    assert facts.headings == [(1, "Our menu"), (2, "Drinks")]
+    assert facts.images_missing_alt == 1
+    assert facts.forms == [{"action": "/order", "method": "post"}]
+    assert facts.unlabelled_fields == 1
+    assert facts.anchors == [{"href": "/about", "text": "About us"}]
+    assert facts.structured_data == [{"@type": "Organization"}]
+    assert facts.scripts == [
+        {"src": "/app.js", "async": False, "defer": True, "inline_size": 0}
+    ]
+    assert facts.html_size == len(PAGE.encode("utf-8"))
+
+
+def test_script_and_style_text_is_not_counted():
+    facts = extract_page_facts(
+        "<html><body><p>two words</p><script>var x = 1;</script></body></html>",
+        url=URL,
+    )
+    assert facts.word_count == 2
+
+
+def test_xhtml_with_xml_declaration():
+    page = (
+        '<?xml version="1.0" encoding="iso-8859-1"?>\n'
+        '<html xmlns="http://www.w3.org/1999/xhtml"><head><title>Café</title>'
+        "</head><body><h1>Hello world</h1></body></html>"
+    )
+    facts = extract_page_facts(page, url=URL)
+
+    assert facts.title == "Café"
+    assert facts.headings == [(1, "Hello world")]
+    assert facts.word_count == 3
+
+
+def test_empty_documents():
+    for page in ("", "   ", "<!-- nothing here -->"):
+        facts = extract_page_facts(page, url=URL)
+        assert facts.title is None
+        assert facts.word_count == 0
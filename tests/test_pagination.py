@@ -0,0 +1,21 @@
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from app.crud.base import InvalidCursor, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    row = SimpleNamespace(
+        created_at=datetime(2026, 10, 17, 9, 30, 1, 5), id=uuid.uuid4()
+    )
+    cursor = encode_cursor(row)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (row.created_at, row.id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "bnVsbA", "WyJ4IiwgInkiXQ"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
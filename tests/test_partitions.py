@@ -0,0 +1,105 @@
+from datetime import datetime
+from app.db.partitions import (
+    add_months,
+    create_partitions,
+    maintain_partitions,
+    month_start,
+)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self.rows
+
+    def scalar(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeConnection:
+    """Records statements and answers the catalog and row lookups"""
+
+    def __init__(self, partitions=(), stray=()):
+        self.partitions = set(partitions)
+        self.stray = set(stray)  # partitions whose rows sit in the default one
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if "pg_inherits" in sql:
+            table = params["table"]
+            return FakeResult(
+                [name for name in self.partitions if name.startswith(f"{table}_")]
+            )
+        if sql.startswith("SELECT EXISTS"):
+            return FakeResult([any(f"'{m}" in sql for m in self.stray)])
+        if sql.startswith("CREATE TABLE"):
+            self.partitions.add(sql.split()[2 if "IF NOT" not in sql else 5])
+        if sql.startswith("DROP TABLE"):
+            self.partitions.discard(sql.split()[2])
+        return FakeResult([])
+
+
+def test_month_arithmetic():
+    assert month_start(datetime(2026, 10, 17, 12)) == datetime(2026, 10, 1)
+    assert add_months(datetime(2026, 11, 1), 2) == datetime(2027, 1, 1)
+    assert add_months(datetime(2026, 1, 1), -1) == datetime(2025, 12, 1)
+
+
+def test_creates_only_missing_partitions():
+    conn = FakeConnection(partitions=["analysis_events_p202610"])
+
+    create_partitions(
+        conn, "analysis_events", datetime(2026, 10, 17), datetime(2027, 1, 1)
+    )
+
+    created = [sql for sql in conn.statements if sql.startswith("CREATE")]
+    assert created == [
+        "CREATE TABLE analysis_events_p202611 PARTITION OF analysis_events "
+        "FOR VALUES FROM ('2026-11-01') TO ('2026-12-01')",
+        "CREATE TABLE analysis_events_p202612 PARTITION OF analysis_events "
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')",
+    ]
+
+
+def test_moves_rows_out_of_the_default_partition():
+    conn = FakeConnection(partitions=["analysis_events_default"], stray=["2026-11"])
+
+    create_partitions(
+        conn, "analysis_events", datetime(2026, 11, 1), datetime(2026, 12, 1)
+    )
+
+    statements = [sql for sql in conn.statements if "pg_inherits" not in sql]
+    assert statements[0].startswith("SELECT EXISTS")
+    assert statements[1].startswith("CREATE TABLE analysis_events_p202611 (LIKE")
+    assert statements[2].startswith(
+        "WITH moved AS (DELETE FROM analysis_events_default"
+    )
+    assert statements[3] == (
+        "ALTER TABLE analysis_events ATTACH PARTITION analysis_events_p202611 "
+        "FOR VALUES FROM ('2026-11-01') TO ('2026-12-01')"
+    )
+
+
+def test_maintenance_keeps_a_default_partition_and_drops_deliveries_first():
+    conn = FakeConnection(
+        partitions=[
+            "analysis_events_p202606",
+            "analysis_events_p202607",
+            "webhook_deliveries_p202606",
+            "webhook_deliveries_p202607",
+        ]
+    )
+
+    dropped = maintain_partitions(
+        conn, datetime(2026, 10, 17), premake_months=1, retention_days=90
+    )
+
+    assert dropped == ["webhook_deliveries_p202606", "analysis_events_p202606"]
+    for table in ("analysis_events", "webhook_deliveries"):
+        assert f"{table}_default" in conn.partitions
+        assert f"{table}_p202607" in conn.partitions
+        assert f"{table}_p202611" in conn.partitions
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import pytest
+from app.core import security
+from app.core.security import PasswordHasherBusy, PasswordHasherPool
+from app.crud.crud_user import user as user_crud
+from app.schemas.user import UserCreate
+
+
+@pytest.fixture
+def pool():
+    pool = PasswordHasherPool(max_workers=1, max_queue=1)
+    yield pool
+    pool.shutdown()
+
+
+async def test_runs_off_the_event_loop(pool):
+    loop_thread = threading.get_ident()
+
+    assert await pool.run(threading.get_ident) != loop_thread
+    assert pool.pending == 0
+
+
+async def test_rejects_calls_beyond_workers_and_queue(pool):
+    release = threading.Event()
+    running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert pool.pending == 2
+
+    with pytest.raises(PasswordHasherBusy):
+        await pool.run(release.wait)
+
+    release.set()
+    assert await asyncio.gather(*running) == [True, True]
+    assert pool.pending == 0
+
+
+async def test_failures_release_their_slot(pool):
+    def boom():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await pool.run(boom)
+    assert pool.pending == 0
+
+
+class FakeAsyncSession:
+    def __init__(self):
+        self.added = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, obj):
+        pass
+
+
+async def test_signup_hashes_in_the_pool(monkeypatch, pool):
+    hashed_in = []
+
+    def get_password_hash(password):
+        hashed_in.append(threading.get_ident())
+        return f"hashed:{password}"
+
+    monkeypatch.setattr(security, "password_hasher", pool)
+    monkeypatch.setattr(security, "get_password_hash", get_password_hash)
+    db = FakeAsyncSession()
+
+    user = await user_crud.create_async(
+        db, obj_in=UserCreate(email="new@example.com", password="s3cret")
+    )
+
+    assert db.added == [user]
+    assert user.password_hash == "hashed:s3cret"
+    assert user.is_active and not user.is_superuser
+    assert user.subscription_tier == "free"
+    assert hashed_in != [threading.get_ident()]
+
+
+async def test_busy_pool_creates_no_user(monkeypatch):
+    busy = PasswordHasherPool(max_workers=1, max_queue=0)
+    busy.pending = 1
+    monkeypatch.setattr(security, "password_hasher", busy)
+    db = FakeAsyncSession()
+
+    with pytest.raises(PasswordHasherBusy):
+        await user_crud.create_async(
+            db, obj_in=UserCreate(email="new@example.com", password="s3cret")
+        )
+    assert db.added == []
@@ -0,0 +1,135 @@
+from uuid import uuid4
+from redis.exceptions import ConnectionError
+from app.core.principal_cache import PrincipalCache
+from app.core.read_through_cache import STORE_IF_CURRENT_SCRIPT
+from app.schemas.user import UserPrincipal
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def incr(self, key):
+        self.commands.append(lambda: self.redis.incr(key))
+
+    def expire(self, key, seconds):
+        pass
+
+    def delete(self, key):
+        self.commands.append(lambda: self.redis.data.pop(key, None))
+
+    def execute(self):
+        for command in self.commands:
+            command()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class FakeRedis:
+    """Serves as both the RedisClient and its async and sync connections"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get_connection(self):
+        return self
+
+    def get_sync_connection(self):
+        return self
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+
+    async def evalsha(self, sha, numkeys, key, generation_key, value, expire, n, seen):
+        assert sha == STORE_IF_CURRENT_SCRIPT.sha
+        if self.data.get(generation_key, "") != seen:
+            return 0
+        self.data[key] = value
+        return 1
+
+
+class DownRedis:
+    async def get(self, key):
+        raise ConnectionError("down")
+
+    async def get_connection(self):
+        raise ConnectionError("down")
+
+    def get_sync_connection(self):
+        raise ConnectionError("down")
+
+
+def make_principal(**kwargs) -> UserPrincipal:
+    values = dict(
+        id=uuid4(),
+        email="user@example.com",
+        is_active=True,
+        is_superuser=False,
+        subscription_tier="free",
+    )
+    values.update(kwargs)
+    return UserPrincipal(**values)
+
+
+async def test_round_trip_through_redis():
+    redis = FakeRedis()
+    principal = make_principal()
+    cache = PrincipalCache(redis)
+    await cache.set(principal, await cache.generation(principal.id))
+
+    # A fresh instance has an empty local cache, so this reads Redis
+    assert await PrincipalCache(redis).get(principal.id) == principal
+
+
+async def test_invalidate_drops_both_levels():
+    redis = FakeRedis()
+    cache = PrincipalCache(redis)
+    principal = make_principal()
+    await cache.set(principal, await cache.generation(principal.id))
+
+    cache.invalidate(principal.id)
+
+    assert await cache.get(principal.id) is None
+    assert await PrincipalCache(redis).get(principal.id) is None
+
+
+async def test_stale_load_is_not_cached_after_invalidation():
+    redis = FakeRedis()
+    cache = PrincipalCache(redis)
+    principal = make_principal()
+
+    # A request loads the active user, then the account is deactivated
+    # before it gets to cache what it loaded
+    generation = await cache.generation(principal.id)
+    cache.invalidate(principal.id)
+    await cache.set(principal, generation)
+
+    assert await cache.get(principal.id) is None
+    assert await PrincipalCache(redis).get(principal.id) is None
+
+    deactivated = make_principal(id=principal.id, is_active=False)
+    await cache.set(deactivated, await cache.generation(principal.id))
+    assert await cache.get(principal.id) == deactivated
+
+
+async def test_redis_errors_degrade_to_misses():
+    cache = PrincipalCache(DownRedis())
+    principal = make_principal()
+
+    assert await cache.get(principal.id) is None
+    generation = await cache.generation(principal.id)
+    await cache.set(principal, generation)
+    assert await cache.get(principal.id) == principal
+    cache.invalidate(principal.id)
+    assert await cache.get(principal.id) is None
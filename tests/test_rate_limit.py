@@ -0,0 +1,190 @@
+import pytest
+from redis.exceptions import ConnectionError, NoScriptError
+from app.core.config import settings
+from app.core.rate_limit import (
+    SCRIPTS,
+    TOKEN_BUCKET,
+    LocalRateLimiter,
+    RateLimiter,
+    RateLimitResult,
+    tier_limit,
+)
+
+
+class FakeLimiter:
+    """Stands in for the Redis-backed limiter with an exact global count"""
+
+    default_limit = 10
+
+    def __init__(self):
+        self.used = {}
+        self.calls = 0
+        self.down = False
+
+    async def hit(self, key, limit=None, window=None, cost=1, flushed=0):
+        if self.down:
+            raise ConnectionError("down")
+        self.calls += 1
+        limit = limit or self.default_limit
+        used = self.used.get(key, 0) + flushed
+        allowed = used + cost <= limit
+        if allowed:
+            used += cost
+        self.used[key] = used
+        return RateLimitResult(
+            allowed, limit, max(limit - used, 0), 0 if allowed else 1
+        )
+
+
+@pytest.fixture(autouse=True)
+def local_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_ENABLED", True)
+
+
+@pytest.fixture
+def shared():
+    return FakeLimiter()
+
+
+def local(shared, **kwargs):
+    kwargs.setdefault("sync_interval", 60)
+    return LocalRateLimiter(shared, overshoot=0.5, **kwargs)
+
+
+async def test_admits_locally_between_syncs(shared):
+    limiter = local(shared)
+
+    results = [await limiter.hit("k") for _ in range(6)]
+
+    assert all(results)
+    # The first hit syncs; the next five fit the local budget of 5
+    assert shared.calls == 1
+    assert limiter._buckets["k"].pending == 5
+
+
+async def test_never_admits_more_than_the_limit(shared):
+    limiter = local(shared, sync_interval=0)
+
+    results = [await limiter.hit("k") for _ in range(15)]
+
+    assert sum(bool(r) for r in results) == 10
+    assert shared.used["k"] == 10
+
+
+async def test_refuses_locally_until_retry_after(shared):
+    limiter = local(shared, sync_interval=0)
+    for _ in range(10):
+        await limiter.hit("k")
+    refused = await limiter.hit("k")
+    calls = shared.calls
+
+    assert not await limiter.hit("k")
+    assert not refused and shared.calls == calls
+
+
+async def test_flush_reports_idle_pending_units(shared):
+    limiter = local(shared)
+    for _ in range(4):
+        await limiter.hit("k")
+
+    await limiter.flush()
+    assert shared.used["k"] == 1
+
+    limiter.sync_interval = 0
+    await limiter.flush()
+    assert shared.used["k"] == 4
+    assert limiter._buckets["k"].pending == 0
+
+
+async def test_flush_reports_units_of_evicted_keys(shared):
+    limiter = local(shared, max_keys=1)
+    for _ in range(3):
+        await limiter.hit("a")
+    await limiter.hit("b")
+
+    assert "a" not in limiter._buckets
+    await limiter.flush()
+    assert shared.used["a"] == 3
+
+
+async def test_failed_flush_keeps_units_pending(shared):
+    limiter = local(shared)
+    for _ in range(3):
+        await limiter.hit("k")
+
+    shared.down = True
+    await limiter.flush(force=True)
+    assert limiter._buckets["k"].pending == 2
+
+    shared.down = False
+    await limiter.flush(force=True)
+    assert shared.used["k"] == 3
+
+
+async def test_failed_sync_keeps_units_pending(shared):
+    limiter = local(shared)
+    for _ in range(6):
+        await limiter.hit("k")
+
+    # The local budget is spent, so the next hit has to sync
+    shared.down = True
+    with pytest.raises(ConnectionError):
+        await limiter.hit("k")
+    assert limiter._buckets["k"].pending == 5
+
+    shared.down = False
+    assert await limiter.hit("k")
+    assert shared.used["k"] == 7
+
+
+class ScriptRedis:
+    """Answers EVALSHA with a canned reply; forgets scripts until loaded"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.loaded = set()
+        self.calls = []
+
+    async def get_connection(self):
+        return self
+
+    async def script_load(self, source):
+        sha = next(s.sha for s in SCRIPTS.values() if s.source == source)
+        self.loaded.add(sha)
+        return sha
+
+    async def evalsha(self, sha, numkeys, *keys_and_args):
+        if sha not in self.loaded:
+            raise NoScriptError("NOSCRIPT")
+        self.calls.append((sha, keys_and_args))
+        return self.reply
+
+
+async def test_hit_is_one_script_call():
+    redis = ScriptRedis([0, 3, 1500])
+    limiter = RateLimiter(redis, prefix="rl", algorithm=TOKEN_BUCKET)
+
+    result = await limiter.hit("user-1", limit=20, window=60, cost=2, flushed=4)
+
+    # Loaded after the first NOSCRIPT, then called once
+    assert redis.calls == [
+        (SCRIPTS[TOKEN_BUCKET].sha, ("rl:token_bucket:user-1", 20, 60, 2, 4))
+    ]
+    assert result == RateLimitResult(
+        allowed=False, limit=20, remaining=3, retry_after=1.5
+    )
+    assert not result
+
+
+def test_unknown_algorithm_is_rejected():
+    with pytest.raises(ValueError):
+        RateLimiter(ScriptRedis(None), algorithm="leaky")
+
+
+def test_tier_limits_fall_back_to_the_default(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_TIERS", {"pro": 300})
+    monkeypatch.setattr(settings, "RATE_LIMIT_PER_MINUTE", 60)
+
+    assert tier_limit("pro") == 300
+    assert tier_limit("unknown") == 60
+    assert tier_limit(None) == 60
@@ -0,0 +1,211 @@
+import asyncio
+from contextlib import asynccontextmanager
+import pytest
+from app.core.cache_invalidation import InvalidationBus
+from app.core.local_cache import LocalCache
+from app.core.read_through_cache import (
+    RELEASE_LOCK_SCRIPT,
+    STORE_IF_CURRENT_SCRIPT,
+    ReadThroughCache,
+)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+
+        return queue
+
+    async def execute(self):
+        commands, self.commands = self.commands, []
+        return [
+            await getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in commands
+        ]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+class FakeRedis:
+    """In-memory stand-in for the commands and scripts the cache uses"""
+
+    def __init__(self):
+        self.data = {}
+        self.published = []
+
+    # RedisClient
+    async def get_connection(self):
+        return self
+
+    async def get_bytes(self, key):
+        return self.data.get(key)
+
+    @asynccontextmanager
+    async def pipeline(self, transaction=False):
+        pipe = FakePipeline(self)
+        yield pipe
+        await pipe.execute()
+
+    # Connection
+    async def get(self, key):
+        value = self.data.get(key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    async def mget(self, keys):
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+
+    async def expire(self, key, seconds):
+        pass
+
+    async def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+
+    async def smembers(self, key):
+        return set(self.data.get(key, ()))
+
+    async def publish(self, channel, message):
+        self.published.append(message)
+
+    async def evalsha(self, sha, numkeys, *keys_and_args):
+        keys, args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        if sha == RELEASE_LOCK_SCRIPT.sha:
+            if self.data.get(keys[0]) == args[0]:
+                del self.data[keys[0]]
+            return 1
+        assert sha == STORE_IF_CURRENT_SCRIPT.sha
+        n = args[2]
+        for generation_key, seen in zip(keys[1 : n + 1], args[3:]):
+            if (self.data.get(generation_key) or "") != seen:
+                return 0
+        self.data[keys[0]] = args[0]
+        for index_key in keys[n + 1 :]:
+            await self.sadd(index_key, keys[0])
+        return 1
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def bus(redis):
+    return InvalidationBus(redis, channel="test")
+
+
+@pytest.fixture
+def cache(redis, bus):
+    return ReadThroughCache(
+        redis,
+        ttl=60,
+        stale_ttl=0,
+        beta=0,
+        local=LocalCache(max_bytes=1 << 20, ttl=60),
+        bus=bus,
+    )
+
+
+class SlowLoader:
+    def __init__(self, payload: bytes):
+        self.payload = payload
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.started.set()
+        await self.release.wait()
+        return self.payload
+
+
+async def test_loads_and_caches(cache):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return b"v1"
+
+    assert await cache.get_or_load("k", load) == b"v1"
+    assert await cache.get_or_load("k", load) == b"v1"
+    assert len(calls) == 1
+
+
+async def test_slow_load_does_not_overwrite_a_newer_set(cache):
+    loader = SlowLoader(b"old")
+    pending = asyncio.ensure_future(cache.get_or_load("k", loader))
+    await loader.started.wait()
+
+    await cache.set("k", b"new")
+    loader.release.set()
+
+    # The caller still gets what it loaded, but it is neither stored nor
+    # cached locally
+    assert await pending == b"old"
+    assert cache.local.get("k") is None
+    assert await cache.get_or_load("k", SlowLoader(b"unused")) == b"new"
+
+
+async def test_slow_load_does_not_survive_a_tag_invalidation(cache, bus):
+    loader = SlowLoader(b"old")
+    pending = asyncio.ensure_future(cache.get_or_load("k", loader, tags=["row:1"]))
+    await loader.started.wait()
+
+    await bus.invalidate(["row:1"])
+    loader.release.set()
+
+    assert await pending == b"old"
+    fresh = SlowLoader(b"fresh")
+    fresh.release.set()
+    assert await cache.get_or_load("k", fresh, tags=["row:1"]) == b"fresh"
+
+
+async def test_own_set_messages_do_not_drop_local_copies(cache, bus, redis):
+    async def load():
+        return b"v1"
+
+    await cache.get_or_load("k", load)
+    for message in redis.published:
+        bus._receive(message)
+
+    assert cache.local.get("k") == b"v1"
+
+
+async def test_messages_from_other_processes_drop_local_copies(cache, bus, redis):
+    async def load():
+        return b"v1"
+
+    await cache.get_or_load("k", load)
+    other = InvalidationBus(redis, channel="test")
+    await other.publish("k")
+    bus._receive(redis.published[-1])
+
+    assert cache.local.get("k") is None
+
+
+def test_tag_invalidations_reach_the_invalidating_process(cache, bus):
+    cache.local.set("k", b"v1", 2, tags=["row:1"])
+
+    bus._receive("row:1")
+
+    assert cache.local.get("k") is None
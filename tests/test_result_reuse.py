@@ -0,0 +1,39 @@
+import uuid
+from types import SimpleNamespace
+from app.models.analysis_data import PerformanceData, SEOData
+from app.services.analyzer_service import (
+    canonical_matches,
+    clone_analysis_data,
+    is_https,
+)
+
+
+def test_canonical_matches():
+    assert canonical_matches("https://example.com/", "https://example.com") is True
+    assert canonical_matches("https://example.com/a", "https://example.com/b") is False
+    assert canonical_matches("https://example.com/", "http://example.com/") is False
+    assert canonical_matches(None, "https://example.com") is None
+
+
+def test_is_https():
+    assert is_https("https://example.com/")
+    assert not is_https("http://example.com/")
+
+
+def test_clone_recomputes_fields_of_the_target_page():
+    target = SimpleNamespace(id=uuid.uuid4(), url="https://example.com/b")
+    seo = SEOData(title_exists=True, canonical_url="https://example.com/a")
+    performance = PerformanceData(
+        resource_count=3,
+        total_page_size=1000.0,
+        resource_timing={"blocking_scripts": 1, "inline_script_bytes": 120},
+    )
+
+    seo_clone = clone_analysis_data(seo, target, 900)
+    performance_clone = clone_analysis_data(performance, target, 900)
+
+    assert seo_clone.analysis_id == target.id and seo_clone.title_exists
+    assert seo_clone.canonical_correct is False
+    assert performance_clone.resource_count == 3
+    assert performance_clone.total_page_size == 900.0
+    assert performance_clone.resource_timing == {"blocking_scripts": 1}
@@ -0,0 +1,330 @@
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+import aiohttp
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.core.config import settings
+from app.services import webhook_service
+from app.services.webhook_service import (
+    CircuitBreaker,
+    WebhookDeliveryEngine,
+    _batches,
+    _window_end,
+    read_truncated_body,
+    retry_delay,
+    signature_headers,
+    subscribed_to,
+)
+
+
+class Clock:
+    def __init__(self, monkeypatch):
+        self.now = 1000.0
+        monkeypatch.setattr(time, "monotonic", lambda: self.now)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    return Clock(monkeypatch)
+
+
+def test_retry_delay_grows_exponentially_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(webhook_service.random, "uniform", lambda low, high: high)
+    strategy = {"base_delay": 2, "max_delay": 30, "multiplier": 3}
+
+    delays = [retry_delay(strategy, attempt) for attempt in range(1, 6)]
+
+    assert delays == [2, 6, 18, 30, 30]
+
+
+def test_retry_delay_is_jittered_below_the_backoff():
+    strategy = {"base_delay": 10, "max_delay": 100, "multiplier": 2}
+
+    delays = {retry_delay(strategy, 3) for _ in range(50)}
+
+    assert all(0 <= delay <= 40 for delay in delays)
+    assert len(delays) > 1
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert not breaker.allow()
+    assert breaker.retry_at == clock.now + 30
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.allow()
+
+
+def test_half_open_breaker_lets_one_trial_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_trial_reopens_the_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert not breaker.allow()
+    assert breaker.retry_at == clock.now + 30
+
+
+class FakeContent:
+    async def iter_chunked(self, size):
+        yield b"ok"
+
+
+class FakeResponse:
+    charset = "utf-8"
+    content = FakeContent()
+
+    def __init__(self, status):
+        self.status = status
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+class FakeSession:
+    """Answers by URL: a status code, or an exception to raise"""
+
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+
+    def post(self, url, **kwargs):
+        outcome = self.outcomes[url]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+def make_delivery(url, retry_count=3, event_data=None):
+    config = SimpleNamespace(
+        id=uuid4(),
+        url=url,
+        secret="secret",
+        batch_window=None,
+        batch_max_size=None,
+        retry_count=retry_count,
+        retry_strategy=None,
+    )
+    event = SimpleNamespace(
+        event_type="analysis.completed",
+        analysis_id=uuid4(),
+        event_data=event_data or {},
+    )
+    return SimpleNamespace(
+        webhook_config=config,
+        analysis_event=event,
+        status="pending",
+        attempt_count=0,
+        next_retry_at=None,
+        request_details=None,
+        response_details=None,
+    )
+
+
+async def deliver(monkeypatch, outcomes, deliveries):
+    async def get_session():
+        return FakeSession(outcomes)
+
+    monkeypatch.setattr(webhook_service.http_client, "get_session", get_session)
+    await WebhookDeliveryEngine(concurrency=4, timeout=1).deliver(deliveries)
+
+
+async def test_one_failing_delivery_does_not_affect_the_others(monkeypatch):
+    ok = make_delivery("https://ok.example/")
+    down = make_delivery("https://down.example/")
+    broken = make_delivery("https://broken.example/")
+    unserializable = make_delivery("https://ok.example/", event_data={"x": object()})
+
+    await deliver(
+        monkeypatch,
+        {
+            "https://ok.example/": 200,
+            "https://down.example/": aiohttp.ClientConnectionError("refused"),
+            "https://broken.example/": RuntimeError("unexpected"),
+        },
+        [ok, down, broken, unserializable],
+    )
+
+    assert ok.status == "success" and ok.attempt_count == 1
+    for delivery in (down, broken, unserializable):
+        assert delivery.status == "pending"
+        assert delivery.attempt_count == 1
+        assert delivery.next_retry_at is not None
+        assert "error" in delivery.response_details
+
+
+async def test_exhausted_deliveries_fail(monkeypatch):
+    delivery = make_delivery("https://down.example/", retry_count=1)
+    delivery.attempt_count = 1
+
+    await deliver(monkeypatch, {"https://down.example/": 503}, [delivery])
+
+    assert delivery.status == "failed"
+    assert delivery.next_retry_at is None
+    assert delivery.response_details == {"status": 503, "body": "ok"}
+
+
+async def test_open_breaker_postpones_without_counting_an_attempt(monkeypatch, clock):
+    monkeypatch.setattr(settings, "WEBHOOK_BREAKER_FAILURE_THRESHOLD", 1)
+    engine = WebhookDeliveryEngine(concurrency=1, timeout=1)
+    engine._breaker("https://down.example/").record_failure()
+    delivery = make_delivery("https://down.example/")
+
+    async def get_session():
+        return FakeSession({})
+
+    monkeypatch.setattr(webhook_service.http_client, "get_session", get_session)
+    await engine.deliver([delivery])
+
+    assert delivery.status == "pending"
+    assert delivery.attempt_count == 0
+    assert delivery.next_retry_at is not None
+
+
+async def test_deliveries_of_expired_events_fail(monkeypatch):
+    expired = make_delivery("https://ok.example/")
+    expired.analysis_event = None
+    ok = make_delivery("https://ok.example/")
+
+    await deliver(monkeypatch, {"https://ok.example/": 200}, [expired, ok])
+
+    assert expired.status == "failed"
+    assert expired.attempt_count == 0
+    assert expired.response_details == {"error": "event expired"}
+    assert ok.status == "success"
+
+
+class ChunkedContent:
+    def __init__(self, body: bytes):
+        self.body = body
+        self.read = 0
+
+    async def iter_chunked(self, size):
+        for i in range(0, len(self.body), size):
+            self.read += 1
+            yield self.body[i : i + size]
+
+
+@pytest.mark.parametrize(
+    "charset, expected",
+    [("utf-8", "héllo"), (None, "héllo"), ("x-user-defined", "héllo")],
+)
+async def test_read_truncated_body_decodes_with_a_usable_charset(charset, expected):
+    response = SimpleNamespace(
+        charset=charset, content=ChunkedContent("héllo".encode("utf-8"))
+    )
+
+    assert await read_truncated_body(response, 100) == expected
+
+
+async def test_read_truncated_body_stops_at_the_limit():
+    content = ChunkedContent(b"x" * 1000)
+    response = SimpleNamespace(charset=None, content=content)
+
+    assert await read_truncated_body(response, 10) == "x" * 10
+    assert content.read == 1
+
+
+def test_signature_is_an_hmac_of_the_timestamp_and_body(monkeypatch):
+    monkeypatch.setattr(time, "time", lambda: 1700000000.5)
+
+    headers = signature_headers("whsec_test", b'{"event":"analysis.completed"}')
+
+    assert headers["X-Webhook-Timestamp"] == "1700000000"
+    assert headers["X-Webhook-Signature"] == (
+        "sha256=5b5a98d10adb8b284dabe95152a79b6a1275a1bc4d89cc46d59d8eec2605b3bc"
+    )
+    assert "X-Webhook-Secret" not in headers
+
+
+def test_plain_secret_header_is_opt_in(monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_SEND_SECRET_HEADER", True)
+
+    assert signature_headers("whsec_test", b"{}")["X-Webhook-Secret"] == "whsec_test"
+
+
+def test_subscription_filter_matches_listed_events_or_an_empty_list():
+    sql = str(
+        subscribed_to("analysis_complete").compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+    # A non-matching list fails the first branch; an empty or NULL list
+    # passes the second
+    assert sql == (
+        "'analysis_complete' = ANY (webhook_configs.event_types) "
+        "OR coalesce(cardinality(webhook_configs.event_types), 0) = 0"
+    )
+
+
+def make_batched_delivery(config):
+    delivery = make_delivery(config.url)
+    delivery.webhook_config = config
+    return delivery
+
+
+def test_batches_group_by_config_up_to_the_size_cap():
+    batched = make_delivery("https://a.example/").webhook_config
+    batched.batch_window, batched.batch_max_size = 60, 2
+    other = make_delivery("https://b.example/").webhook_config
+    other.batch_window = 60
+    a = [make_batched_delivery(batched) for _ in range(5)]
+    b = [make_batched_delivery(other) for _ in range(2)]
+    single = make_delivery("https://c.example/")
+
+    batches = _batches([a[0], b[0], single, a[1], a[2], b[1], a[3], a[4]])
+
+    assert batches == [[single], [a[0], a[1]], [a[2], a[3]], [a[4]], b]
+
+
+def test_batches_fall_back_to_the_default_size_cap(monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_BATCH_MAX_SIZE", 3)
+    config = make_delivery("https://a.example/").webhook_config
+    config.batch_window = 60
+    deliveries = [make_batched_delivery(config) for _ in range(4)]
+
+    assert [len(batch) for batch in _batches(deliveries)] == [3, 1]
+
+
+@pytest.mark.parametrize(
+    "now, expected",
+    [
+        (datetime(2026, 10, 17, 12, 0, 30), datetime(2026, 10, 17, 12, 1)),
+        (datetime(2026, 10, 17, 12, 0, 59, 500000), datetime(2026, 10, 17, 12, 1)),
+        (datetime(2026, 10, 17, 12, 1), datetime(2026, 10, 17, 12, 2)),
+    ],
+)
+def test_window_end_is_aligned_to_the_window(now, expected):
+    assert _window_end(now, 60) == expected
+    assert _window_end(now, 300) == datetime(2026, 10, 17, 12, 5)